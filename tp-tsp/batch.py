@@ -0,0 +1,289 @@
+"""Resuelve en lote un conjunto de instancias, sin graficar.
+
+Para cada instancia, algoritmo, semilla y repeticion ejecuta una corrida y
+escribe un registro por corrida, en CSV o en JSON, con:
+
+* instance, n: nombre de la instancia y cantidad de ciudades
+* algorithm, seed, rep: algoritmo, semilla y numero de repeticion
+* value: valor objetivo del mejor tour (el opuesto de su largo)
+* length: largo del mejor tour
+* gap: diferencia porcentual entre el largo y el optimo conocido de la
+  instancia (vacia si no se conoce, ver OPTIMA)
+* time, niters, nevals: tiempo, iteraciones y diferencias evaluadas
+
+La semilla fija todos los sorteos de la corrida (desempates, estados y
+movimientos aleatorios), de modo que con presupuestos que no dependen del
+tiempo cada corrida es reproducible. El limite de tiempo (--time-limit) se
+suma al presupuesto propio de cada algoritmo, sin reemplazar sus demas
+limites.
+
+Las corridas se reparten entre varios procesos, y cada proceso lee cada
+instancia una unica vez. Con --cache los procesos abren la misma matriz de
+distancias mapeada en memoria en lugar de tener una copia cada uno.
+
+Uso: python batch.py instancias [instancias ...] [--algos A [A ...]]
+     [--seeds S [S ...]] [--repeat R] [--workers W] [--output archivo]
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from glob import glob
+from itertools import product
+from typing import Iterable, NamedTuple, TextIO
+import csv
+import json
+import os
+import random
+import sys
+import numpy as np
+from distance import STORAGE_TYPES
+import load
+import problem
+import search
+
+# Largo del tour optimo de las instancias de TSPLIB incluidas
+OPTIMA = {"burma14": 3323, "ulysses16": 6859, "att48": 10628,
+          "berlin52": 7542, "pr76": 108159}
+
+# Columnas de cada registro
+FIELDS = ("instance", "n", "algorithm", "seed", "rep", "value", "length",
+          "gap", "time", "niters", "nevals")
+
+
+class Task(NamedTuple):
+    """Una corrida del lote."""
+    filename: str
+    algorithm: str
+    seed: int
+    rep: int
+
+
+class Settings(NamedTuple):
+    """Opciones comunes a todas las corridas."""
+    init: str = problem.IDENTITY
+    time_limit: float | None = None
+    lazy: bool = False
+    packed: str | None = None
+    cache: bool = False
+    cache_rows: int = 0
+
+
+def instance_files(patterns: Iterable[str]) -> list[str]:
+    """Expande directorios y patrones glob en la lista de instancias.
+
+    Un directorio equivale a todos sus archivos .tsp. Los archivos se
+    ordenan por nombre dentro de cada patron y no se repiten.
+    """
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*.tsp")
+        for filename in sorted(glob(pattern)):
+            if filename not in files:
+                files.append(filename)
+    return files
+
+
+def instance_name(filename: str) -> str:
+    """Nombre de una instancia, el de su archivo sin la extension."""
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+def gap(name: str, length: float) -> float | None:
+    """Diferencia porcentual con el optimo conocido, o None si no se conoce."""
+    optimum = OPTIMA.get(name)
+    if optimum is None:
+        return None
+    return 100 * (length - optimum) / optimum
+
+
+def cap_time(budget: search.Budget, time_limit: float | None) -> None:
+    """Limita el tiempo de un presupuesto a time_limit segundos.
+
+    Conserva los demas limites del presupuesto, y su limite de tiempo si es
+    menor que time_limit.
+    """
+    if time_limit is not None and (budget.time_limit is None
+                                   or budget.time_limit > time_limit):
+        budget.time_limit = time_limit
+
+
+def prepare(algorithm: str, seed: int, init: str | None = None,
+            time_limit: float | None = None) -> search.LocalSearch:
+    """Prepara una corrida: fija la semilla y construye el algoritmo.
+
+    Argumentos:
+    ==========
+    algorithm: str
+        nombre del algoritmo, ver search.ALGORITHMS
+    seed: int
+        semilla de todos los sorteos de la corrida
+    init: str | None
+        tour inicial del algoritmo, ver problem.INITS
+    time_limit: float | None
+        limite de tiempo de la corrida, en segundos, ademas del
+        presupuesto propio del algoritmo
+
+    Retorno:
+    =======
+    algo: search.LocalSearch
+        el algoritmo, listo para resolver
+    """
+    random.seed(seed)
+    np.random.seed(seed)
+    algo = search.ALGORITHMS[algorithm](init=init)
+    if hasattr(algo, "seed"):
+        algo.seed = seed
+    cap_time(algo.budget, time_limit)
+    return algo
+
+
+def solve(p: problem.TSP, algorithm: str, seed: int,
+          init: str | None = None,
+          time_limit: float | None = None) -> search.LocalSearch:
+    """Ejecuta una corrida de un algoritmo sobre una instancia.
+
+    Los argumentos son los de prepare, mas la instancia p. Devuelve el
+    algoritmo, con los resultados de la corrida.
+    """
+    algo = prepare(algorithm, seed, init, time_limit)
+    algo.solve(p)
+    return algo
+
+
+def record(name: str, p: problem.TSP, algorithm: str, seed: int,
+           algo: search.LocalSearch) -> dict:
+    """Registro de una corrida, con las columnas de FIELDS salvo rep."""
+    length = -algo.value
+    return {"instance": name, "n": p.n, "algorithm": algorithm,
+            "seed": seed, "value": algo.value, "length": length,
+            "gap": gap(name, length), "time": algo.time,
+            "niters": algo.niters, "nevals": algo.nevals}
+
+
+# Estado de cada proceso del lote
+_settings = Settings()
+
+
+def _init_worker(settings: Settings) -> None:
+    """Guarda las opciones comunes en el proceso."""
+    global _settings
+    _settings = settings
+    read_instance.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def read_instance(filename: str) -> problem.TSP:
+    """Lee una instancia, una unica vez por proceso."""
+    if _settings.lazy:
+        dist, coords = load.read_tsp_lazy(filename, _settings.cache_rows,
+                                          cache=_settings.cache)
+    elif _settings.packed:
+        dist, coords = load.read_tsp_packed(filename, _settings.packed)
+    else:
+        dist, coords = load.read_tsp_native(filename, cache=_settings.cache)
+    return problem.TSP(None, dist=dist, coords=coords)
+
+
+def run(task: Task) -> dict:
+    """Ejecuta una corrida y devuelve su registro."""
+    p = read_instance(task.filename)
+    algo = solve(p, task.algorithm, task.seed, _settings.init,
+                 _settings.time_limit)
+    return {**record(instance_name(task.filename), p, task.algorithm,
+                     task.seed, algo), "rep": task.rep}
+
+
+def run_all(tasks: list[Task], settings: Settings,
+            workers: int = 1) -> Iterable[dict]:
+    """Ejecuta las corridas y devuelve sus registros, en el mismo orden.
+
+    Con workers > 1 las corridas se reparten entre un pool de procesos.
+    """
+    if workers <= 1:
+        _init_worker(settings)
+        yield from map(run, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(settings,)) as pool:
+        yield from pool.map(run, tasks)
+
+
+def write_csv(records: Iterable[dict], file: TextIO) -> None:
+    """Escribe los registros en CSV a medida que se obtienen."""
+    writer = csv.DictWriter(file, fieldnames=FIELDS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        file.flush()
+
+
+def write_json(records: Iterable[dict], file: TextIO) -> None:
+    """Escribe los registros como una lista de JSON."""
+    json.dump(list(records), file, indent=1)
+    file.write("\n")
+
+
+def main() -> None:
+    """Funcion principal."""
+    parser = ArgumentParser(
+        description="Solve a batch of TSP instances without plotting.")
+    parser.add_argument("instances", nargs="+",
+                        help="TSPLIB files, directories or glob patterns")
+    parser.add_argument("--algos", nargs="+", choices=search.ALGORITHMS,
+                        default=list(search.ALGORITHMS),
+                        help="algorithms to run (default: all)")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[0],
+                        help="random seeds, one run per seed")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="repetitions of every run")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of worker processes")
+    parser.add_argument("--time-limit", type=float,
+                        help="time limit of every run, in seconds, on "
+                             "top of the budget of each algorithm")
+    parser.add_argument("--init", choices=problem.INITS,
+                        default=problem.IDENTITY,
+                        help="initial tour of every algorithm")
+    parser.add_argument("--lazy", action="store_true",
+                        help="compute distances on demand from the "
+                             "coordinates")
+    parser.add_argument("--cache-rows", type=int, default=0,
+                        help="with --lazy, number of distance rows kept in "
+                             "memory (0 to keep none)")
+    parser.add_argument("--packed", nargs="?", const="int32",
+                        choices=STORAGE_TYPES,
+                        help="store only the upper triangle of the "
+                             "distance matrix")
+    parser.add_argument("--cache", action="store_true",
+                        help="read the instances through the binary cache")
+    parser.add_argument("--output",
+                        help="output file (default: standard output)")
+    parser.add_argument("--format", choices=("csv", "json"),
+                        help="output format (default: from the output "
+                             "file extension, or csv)")
+    args = parser.parse_args()
+
+    files = instance_files(args.instances)
+    if not files:
+        parser.error("no instances found")
+    fmt = args.format or ("json" if args.output and
+                          args.output.endswith(".json") else "csv")
+    tasks = [Task(f, a, s, r) for f, a, s, r in
+             product(files, args.algos, args.seeds, range(args.repeat))]
+    settings = Settings(args.init, args.time_limit, args.lazy, args.packed,
+                        args.cache, args.cache_rows)
+
+    records = run_all(tasks, settings, args.workers)
+    write = write_json if fmt == "json" else write_csv
+    if args.output is None:
+        write(records, sys.stdout)
+        return
+    with open(args.output, "w", newline="") as file:
+        write(records, file)
+
+
+if __name__ == "__main__":
+    main()
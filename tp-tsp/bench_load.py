@@ -0,0 +1,81 @@
+"""Compara el tiempo de carga de instancias con tsplib95 y con el lector propio.
+
+Para cada instancia mide, como minimo de varias repeticiones:
+
+* tsplib95: load.read_tsp (tsplib95 y el grafo de networkx) mas la matriz
+  de distancias que construye problem.TSP a partir del grafo.
+* native: load.read_tsp_native, que carga la matriz directamente.
+* cached: load.read_tsp_native con el cache en disco ya creado, que abre la
+  matriz como memoria mapeada.
+
+Tambien mide una unica vez el tiempo de importar tsplib95, que solo paga el
+primer camino, y verifica que todos los caminos den la misma matriz.
+
+Uso: python bench_load.py [instancias.tsp ...] [--repeat R]
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser
+from glob import glob
+from time import perf_counter
+import os
+import numpy as np
+import load
+import problem
+
+INSTANCES = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "instances", "*.tsp")
+
+
+def best_time(func, repeat: int) -> tuple[float, object]:
+    """Mejor tiempo de varias ejecuciones de func y su ultimo resultado."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = perf_counter()
+        result = func()
+        best = min(best, perf_counter() - start)
+    return best, result
+
+
+def tsplib95_dist(filename: str) -> np.ndarray:
+    """Matriz de distancias por el camino de tsplib95 y networkx."""
+    G, coords = load.read_tsp(filename)
+    return problem.TSP(G, coords=coords).dist
+
+
+def native_dist(filename: str, cache: bool = False) -> np.ndarray:
+    """Matriz de distancias por el lector propio."""
+    return load.read_tsp_native(filename, cache=cache)[0]
+
+
+def main() -> None:
+    """Funcion principal."""
+    parser = ArgumentParser(description="Benchmark the instance loaders.")
+    parser.add_argument("files", nargs="*", help="TSPLIB files")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="repetitions per instance (best time is kept)")
+    args = parser.parse_args()
+    files = args.files or sorted(glob(INSTANCES))
+
+    start = perf_counter()
+    import tsplib95  # noqa: F401
+    print("import tsplib95: %.3f s" % (perf_counter() - start))
+
+    print("%-20s %6s %12s %12s %12s %8s %6s" % (
+        "instance", "n", "tsplib95 s", "native s", "cached s", "speedup",
+        "same"))
+    for filename in files:
+        slow, expected = best_time(lambda: tsplib95_dist(filename),
+                                   args.repeat)
+        fast, dist = best_time(lambda: native_dist(filename), args.repeat)
+        native_dist(filename, cache=True)  # crea el cache si no existe
+        cached, mapped = best_time(lambda: native_dist(filename, cache=True),
+                                   args.repeat)
+        print("%-20s %6d %12.5f %12.5f %12.5f %7.1fx %6s" % (
+            os.path.basename(filename), len(dist), slow, fast, cached,
+            slow / min(fast, cached),
+            np.array_equal(expected, dist) and np.array_equal(dist, mapped)))
+
+
+if __name__ == "__main__":
+    main()
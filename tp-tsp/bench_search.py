@@ -0,0 +1,228 @@
+"""Benchmark de las busquedas locales.
+
+Ejecuta cada algoritmo sobre las instancias de instances/ y sobre instancias
+aleatorias generadas con una semilla fija (ciudades con coordenadas enteras
+uniformes en un cuadrado de 10000 x 10000, con distancias EUC_2D). Para
+cada instancia y algoritmo informa:
+
+* length y gap: largo del mejor tour y diferencia porcentual con el optimo
+  conocido (ver batch.OPTIMA)
+* time: tiempo de la corrida, medido con time.perf_counter alrededor de
+  solve (sin fijar la semilla ni construir el algoritmo)
+* best: tiempo hasta encontrar el mejor tour, que en los ascensos es el
+  tiempo hasta el optimo local
+* iters/s y evals/s: iteraciones y diferencias evaluadas por segundo
+
+Cada medicion repite la corrida, con la misma semilla, hasta sumar MIN_TIME
+segundos, y divide el total de iteraciones y evaluaciones por el total de
+tiempo: asi las corridas de menos de un milisegundo no quedan dominadas por
+la resolucion del reloj. Se hacen varias mediciones (--repeat) y se informa
+la mediana segun las evaluaciones por segundo, que es menos sensible al
+ruido de la maquina que la mas rapida. Ademas del presupuesto propio de cada
+algoritmo, todas las corridas tienen un limite de tiempo (--time-limit).
+
+Los resultados se pueden guardar como linea de base (--save) y comparar con
+una linea de base anterior (--compare). Hay una regresion si las
+evaluaciones por segundo bajan mas que la tolerancia (solo en las corridas
+de al menos MIN_DURATION segundos, ya que en las mas cortas pesan los
+costos fijos de cada corrida), o si el largo del
+tour empeora en una corrida que no se corto por tiempo (y por lo tanto no
+depende de la velocidad de la maquina). En ese caso el programa termina con
+codigo de salida 1.
+
+Uso: python bench_search.py [instancias.tsp ...] [--random N [N ...]]
+     [--algos A [A ...]] [--repeat R] [--save base.json]
+     [--compare base.json]
+"""
+
+from __future__ import annotations
+from argparse import ArgumentParser
+from operator import itemgetter
+from time import perf_counter
+import json
+import platform
+import sys
+import numpy as np
+from batch import instance_files, instance_name, prepare, record
+from bench_load import INSTANCES
+from distance import LazyDistance
+import load
+import problem
+import search
+
+RANDOM_SIZES = (1000,)  # ciudades de las instancias aleatorias
+RANDOM_SIDE = 10000  # lado del cuadrado de las instancias aleatorias
+MIN_TIME = 0.5  # tiempo minimo de cada medicion, en segundos
+MIN_DURATION = 0.01  # duracion minima de una corrida para comparar su velocidad
+
+
+def random_instance(n: int, seed: int = 0) -> problem.TSP:
+    """Genera una instancia aleatoria reproducible de n ciudades."""
+    rng = np.random.default_rng(seed)
+    points = rng.integers(0, RANDOM_SIDE, size=(n, 2)).astype(np.float64)
+    dist = np.asarray(LazyDistance(points))
+    coords = dict(enumerate(map(tuple, points.tolist()), start=1))
+    return problem.TSP(None, dist=dist, coords=coords)
+
+
+def measure(p: problem.TSP, algorithm: str, seed: int,
+            time_limit: float | None) -> tuple[search.LocalSearch, dict]:
+    """Repite una corrida hasta sumar MIN_TIME segundos y mide su velocidad.
+
+    Solo se mide el tiempo de solve. Devuelve el algoritmo de la ultima
+    corrida y un diccionario con el tiempo medio por corrida ("time") y
+    las iteraciones y evaluaciones por segundo del total ("iters_s" y
+    "evals_s").
+    """
+    runs, niters, nevals, elapsed = 0, 0, 0, 0.0
+    while runs == 0 or elapsed < MIN_TIME:
+        algo = prepare(algorithm, seed, time_limit=time_limit)
+        start = perf_counter()
+        algo.solve(p)
+        elapsed += perf_counter() - start
+        runs += 1
+        niters += algo.niters
+        nevals += algo.nevals
+    elapsed = max(elapsed, 1e-9)
+    return algo, {"time": elapsed / runs, "iters_s": niters / elapsed,
+                  "evals_s": nevals / elapsed}
+
+
+def bench(p: problem.TSP, name: str, algorithm: str, seed: int,
+          repeat: int, time_limit: float | None) -> dict:
+    """Ejecuta un algoritmo sobre una instancia y mide su rendimiento.
+
+    Argumentos:
+    ==========
+    p: problem.TSP
+        la instancia
+    name: str
+        nombre de la instancia
+    algorithm: str
+        nombre del algoritmo, ver search.ALGORITHMS
+    seed: int
+        semilla de todos los sorteos de la corrida
+    repeat: int
+        cantidad de mediciones, ver measure
+    time_limit: float | None
+        limite de tiempo de cada corrida, en segundos
+
+    Retorno:
+    =======
+    record: dict
+        resultados de la medicion mediana segun las evaluaciones por
+        segundo (la menor de las dos medianas si son una cantidad par)
+    """
+    results = []
+    for _ in range(max(repeat, 1)):
+        algo, speed = measure(p, algorithm, seed, time_limit)
+        budget = algo.budget
+        result = record(name, p, algorithm, seed, algo)
+        result.update(speed)
+        result.update({
+            "best": algo.history[-1].time if algo.history else algo.time,
+            # Si la corrida se corto por tiempo, su resultado depende de la
+            # velocidad de la maquina
+            "timed": (budget.time_limit is not None
+                      and algo.time >= budget.time_limit)})
+        results.append(result)
+    results.sort(key=itemgetter("evals_s"))
+    return results[(len(results) - 1) // 2]
+
+
+def compare(record: dict, base: dict | None, tolerance: float) -> str:
+    """Compara un resultado con el de la linea de base.
+
+    Retorno:
+    =======
+    status: str
+        "new" si no esta en la linea de base, "slower" si las evaluaciones
+        por segundo bajaron mas que la tolerancia en una corrida de al menos
+        MIN_DURATION segundos, "worse" si el tour empeoro sin cortarse por
+        tiempo, u "ok"
+    """
+    if base is None:
+        return "new"
+    if (min(record["time"], base["time"]) >= MIN_DURATION
+            and record["evals_s"] < (1 - tolerance) * base["evals_s"]):
+        return "slower"
+    if (not record["timed"] and not base["timed"]
+            and record["length"] > base["length"]):
+        return "worse"
+    return "ok"
+
+
+def main() -> None:
+    """Funcion principal."""
+    parser = ArgumentParser(description="Benchmark the local searches.")
+    parser.add_argument("files", nargs="*",
+                        help="TSPLIB files, directories or glob patterns "
+                             "(default: the bundled instances)")
+    parser.add_argument("--random", nargs="*", type=int,
+                        default=list(RANDOM_SIZES),
+                        help="sizes of the random instances")
+    parser.add_argument("--algos", nargs="+", choices=search.ALGORITHMS,
+                        default=list(search.ALGORITHMS),
+                        help="algorithms to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed of the instances and the runs")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="measurements per run, each of at least "
+                             "%.1f s (the median is reported)" % MIN_TIME)
+    parser.add_argument("--time-limit", type=float, default=2.0,
+                        help="time limit of every run, in seconds")
+    parser.add_argument("--save", help="save the results as a baseline")
+    parser.add_argument("--compare", help="baseline to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative drop of evaluations/second")
+    args = parser.parse_args()
+
+    instances = []
+    for filename in instance_files(args.files or [INSTANCES]):
+        dist, coords = load.read_tsp_native(filename)
+        instances.append((instance_name(filename),
+                          problem.TSP(None, dist=dist, coords=coords)))
+    for n in args.random:
+        instances.append((f"rand{n}", random_instance(n, args.seed)))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as file:
+            for base in json.load(file)["results"]:
+                baseline[base["instance"], base["algorithm"]] = base
+
+    print("%-12s %6s %-10s %10s %7s %8s %8s %10s %10s %8s" % (
+        "instance", "n", "algorithm", "length", "gap %", "time s",
+        "best s", "iters/s", "evals/s", "status"))
+    records, regressions = [], 0
+    for name, p in instances:
+        for algorithm in args.algos:
+            record = bench(p, name, algorithm, args.seed, args.repeat,
+                           args.time_limit)
+            records.append(record)
+            status = ""
+            if args.compare:
+                status = compare(record, baseline.get((name, algorithm)),
+                                 args.tolerance)
+                regressions += status in ("slower", "worse")
+            print("%-12s %6d %-10s %10.0f %7s %8.3f %8.3f %10.0f %10.0f %8s"
+                  % (name, p.n, algorithm, record["length"],
+                     "-" if record["gap"] is None else "%.2f" % record["gap"],
+                     record["time"], record["best"], record["iters_s"],
+                     record["evals_s"], status), flush=True)
+
+    if args.save:
+        meta = {"python": platform.python_version(),
+                "numpy": np.__version__, "platform": platform.platform(),
+                "seed": args.seed, "repeat": args.repeat,
+                "time_limit": args.time_limit}
+        with open(args.save, "w") as file:
+            json.dump({"meta": meta, "results": records}, file, indent=1)
+            file.write("\n")
+    if regressions:
+        print(f"{regressions} regression(s) against {args.compare}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,453 @@
+"""Este modulo define las clases LazyDistance y PackedDistance.
+
+Ambas reemplazan a la matriz densa de distancias de un TSP:
+
+* LazyDistance, cuando las distancias se calculan a partir de las
+  coordenadas de las ciudades. Solo guarda las coordenadas, con memoria
+  O(n), y calcula cada distancia cuando se la pide, con la misma formula y
+  el mismo redondeo que TSPLIB para el tipo de peso de la instancia
+  (EDGE_WEIGHT_TYPE).
+* PackedDistance, cuando las distancias son simetricas. Guarda solo el
+  triangulo superior de la matriz, sin la diagonal, como enteros o reales
+  de 32 bits: ocupa la mitad de memoria que una matriz densa de 32 bits y
+  la cuarta parte que una de 64 bits.
+
+Ambas se indexan igual que un arreglo de NumPy de n x n:
+
+* dist[u, v] con enteros devuelve una distancia,
+* dist[u, v] con arreglos de indices devuelve las distancias elemento a
+  elemento, con las reglas de broadcasting de NumPy,
+* dist[u] devuelve la fila de la ciudad u,
+* dist.item(u, v) devuelve una distancia como float de Python.
+
+Las distancias se devuelven como float64, igual que la matriz densa.
+LazyDistance puede guardar ademas las ultimas filas calculadas en un cache
+acotado (las menos usadas recientemente se descartan).
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from math import acos, ceil, cos, sqrt
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable
+import numpy as np
+from shared import SharedRef, share_array
+
+# Tipos de peso de TSPLIB que se calculan a partir de coordenadas en el plano
+EUC_2D = "EUC_2D"
+CEIL_2D = "CEIL_2D"
+ATT = "ATT"
+GEO = "GEO"
+MAN_2D = "MAN_2D"
+MAX_2D = "MAX_2D"
+WEIGHT_TYPES = (EUC_2D, CEIL_2D, ATT, GEO, MAN_2D, MAX_2D)
+
+EARTH_RADIUS = 6378.388  # radio de la Tierra de TSPLIB, en kilometros
+
+# Tipos con los que PackedDistance guarda las distancias
+STORAGE_TYPES = ("int32", "float32")
+
+
+class LazyDistance:
+    """Distancias entre ciudades calculadas bajo demanda."""
+
+    def __init__(self, coords: np.ndarray, weight_type: str = EUC_2D,
+                 cache_rows: int = 0) -> None:
+        """Construye las distancias de una instancia.
+
+        Argumentos:
+        ==========
+        coords: np.ndarray
+            matriz de n x 2 con las coordenadas de cada ciudad, indexada
+            desde 0
+        weight_type: str
+            tipo de peso de TSPLIB (EUC_2D, CEIL_2D, ATT, GEO, MAN_2D o
+            MAX_2D)
+        cache_rows: int
+            cantidad maxima de filas guardadas (0 para no guardar ninguna)
+        """
+        if weight_type not in WEIGHT_TYPES:
+            raise ValueError(f"tipo de peso no soportado: {weight_type}")
+        self.coords = np.asarray(coords, dtype=np.float64)
+        self.n = len(self.coords)
+        self.shape = (self.n, self.n)
+        self.ndim = 2
+        self.dtype = np.dtype(np.float64)
+        self.weight_type = weight_type
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()  # filas calculadas, de la mas antigua
+        # Las coordenadas GEO se pasan una unica vez a radianes
+        self._points = (_geo_radians(self.coords) if weight_type == GEO
+                        else self.coords)
+        self._x = self._points[:, 0].tolist()
+        self._y = self._points[:, 1].tolist()
+        self._weight = _SCALAR[weight_type]
+
+    def __len__(self) -> int:
+        """Cantidad de ciudades."""
+        return self.n
+
+    def item(self, u: int, v: int) -> float:
+        """Distancia entre las ciudades u y v.
+
+        Si la fila de u esta en el cache se lee de ella, pero una distancia
+        suelta no calcula ni guarda la fila entera.
+        """
+        if self._rows:
+            row = self._rows.get(u)
+            if row is not None:
+                return row.item(v)
+        return self._weight(self._x[u], self._y[u], self._x[v], self._y[v])
+
+    def row(self, u: int) -> np.ndarray:
+        """Distancias desde la ciudad u hacia todas las ciudades."""
+        row = self._rows.get(u)
+        if row is not None:
+            self._rows.move_to_end(u)
+            return row
+        row = _weights(self._points[u], self._points, self.weight_type)
+        if self.cache_rows > 0:
+            row.flags.writeable = False  # se comparte entre consultas
+            self._rows[u] = row
+            if len(self._rows) > self.cache_rows:
+                self._rows.popitem(last=False)
+        return row
+
+    def __getitem__(self, key) -> np.ndarray | np.float64:
+        """Distancias con la misma indexacion que una matriz de n x n.
+
+        Con cache, las consultas de filas enteras o de parte de una fila
+        (dist[u], dist[u, idx], dist[a:b]) pasan por self.row, y por lo
+        tanto guardan las filas que calculan.
+        """
+        if not isinstance(key, tuple):
+            if isinstance(key, (int, np.integer)):
+                return self.row(int(key))
+            return self[key, slice(None)]
+        u, v = key
+        if isinstance(u, (int, np.integer)):
+            if isinstance(v, (int, np.integer)):
+                return np.float64(self.item(int(u), int(v)))
+            if self.cache_rows > 0:
+                return self.row(int(u))[v]
+        elif (self.cache_rows > 0 and isinstance(v, slice)
+              and v == slice(None)):
+            rows = _as_index(u, self.n)
+            if rows.ndim == 1:
+                return np.array([self.row(r) for r in rows.tolist()],
+                                dtype=np.float64).reshape(len(rows), self.n)
+        u, v = _as_index(u, self.n), _as_index(v, self.n)
+        if isinstance(key[1], slice) and u.ndim == 1:
+            u = u[:, None]  # dist[rows, :] devuelve una fila por indice
+        return _weights(self._points[u], self._points[v], self.weight_type)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Construye la matriz densa, con memoria O(n^2)."""
+        full = _weights(self._points[:, None], self._points[None, :],
+                        self.weight_type)
+        return full if dtype is None else full.astype(dtype)
+
+    def __getstate__(self) -> dict:
+        """Estado que se transfiere al copiar a otro proceso, sin el cache."""
+        state = dict(self.__dict__)
+        state['_rows'] = OrderedDict()
+        return state
+
+
+class PackedDistance:
+    """Distancias simetricas guardadas como triangulo superior."""
+
+    def __init__(self, data: np.ndarray, n: int) -> None:
+        """Construye las distancias a partir del triangulo ya empaquetado.
+
+        Argumentos:
+        ==========
+        data: np.ndarray
+            arreglo de n * (n - 1) / 2 distancias, con las filas del
+            triangulo superior sin la diagonal una tras otra: (0, 1), ...,
+            (0, n-1), (1, 2), ..., (n-2, n-1)
+        n: int
+            cantidad de ciudades
+        """
+        if len(data) != n * (n - 1) // 2:
+            raise ValueError(f"se esperaban {n * (n - 1) // 2} distancias "
+                             f"para {n} ciudades, no {len(data)}")
+        self.data = data
+        self.n = n
+        self.shape = (n, n)
+        self.ndim = 2
+        self.dtype = np.dtype(np.float64)
+        # La distancia (u, v) con u < v esta en data[offset[u] + v]
+        u = np.arange(n, dtype=np.int64)
+        self._offset = u * n - u * (u + 1) // 2 - u - 1
+        self._offsets = self._offset.tolist()
+        self._item = data.item
+        self._shared = None  # referencia a data en memoria compartida
+        self._shm = None  # bloque de memoria compartida abierto
+
+    @classmethod
+    def from_rows(cls, n: int, row: Callable[[int], np.ndarray],
+                  dtype: str = "int32") -> PackedDistance:
+        """Empaqueta una matriz simetrica recorriendola por filas.
+
+        Solo se recorre la parte de cada fila a la derecha de la diagonal,
+        de modo que no hace falta tener la matriz completa en memoria.
+
+        Argumentos:
+        ==========
+        n: int
+            cantidad de ciudades
+        row: Callable[[int], np.ndarray]
+            funcion que devuelve la fila u de la matriz
+        dtype: str
+            tipo con el que se guardan las distancias (int32 o float32)
+        """
+        packed = cls(np.empty(n * (n - 1) // 2, dtype=_storage(dtype)), n)
+        for u in range(n - 1):
+            start = packed._offsets[u] + u + 1
+            packed.data[start:start + n - u - 1] = as_storage(
+                np.asarray(row(u))[u + 1:], dtype)
+        return packed
+
+    @classmethod
+    def from_triangle(cls, data: np.ndarray, n: int, lower: bool = False,
+                      diag: bool = False) -> PackedDistance:
+        """Empaqueta un triangulo de la matriz recorrido por filas.
+
+        Argumentos:
+        ==========
+        data: np.ndarray
+            las distancias del triangulo, fila por fila, ya en el tipo con
+            el que se guardan
+        n: int
+            cantidad de ciudades
+        lower: bool
+            si es el triangulo inferior (si no, el superior)
+        diag: bool
+            si incluye la diagonal, que se descarta
+        """
+        size = n * (n - 1) // 2
+        if not lower and not diag:
+            return cls(data[:size], n)  # ya tiene el orden empaquetado
+        packed = cls(np.empty(size, dtype=data.dtype), n)
+        offset, start = packed._offset, 0
+        for u in range(n):
+            if lower:
+                # Fila u del triangulo inferior: (u, 0), ..., (u, u-1)
+                packed.data[offset[:u] + u] = data[start:start + u]
+                start += u + diag
+            else:
+                # Fila u del triangulo superior: (u, u+1), ..., (u, n-1)
+                start += diag
+                first, count = packed._offsets[u] + u + 1, n - u - 1
+                packed.data[first:first + count] = data[start:start + count]
+                start += count
+        return packed
+
+    @classmethod
+    def from_matrix(cls, matrix: np.ndarray,
+                    dtype: str = "int32") -> PackedDistance:
+        """Empaqueta una matriz de n x n, que debe ser simetrica."""
+        n = len(matrix)
+        for u in range(n):
+            if not np.array_equal(matrix[u, u + 1:], matrix[u + 1:, u]):
+                raise ValueError("la matriz de distancias no es simetrica")
+        return cls.from_rows(n, matrix.__getitem__, dtype)
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por las distancias, en bytes."""
+        return self.data.nbytes
+
+    def __len__(self) -> int:
+        """Cantidad de ciudades."""
+        return self.n
+
+    def item(self, u: int, v: int) -> float:
+        """Distancia entre las ciudades u y v."""
+        if u < v:
+            return float(self._item(self._offsets[u] + v))
+        if v < u:
+            return float(self._item(self._offsets[v] + u))
+        return 0.0
+
+    def row(self, u: int) -> np.ndarray:
+        """Distancias desde la ciudad u hacia todas las ciudades."""
+        row = np.empty(self.n)
+        row[:u] = self.data[self._offset[:u] + u]
+        row[u] = 0
+        start = self._offsets[u] + u + 1
+        row[u + 1:] = self.data[start:start + self.n - u - 1]
+        return row
+
+    def __getitem__(self, key) -> np.ndarray | np.float64:
+        """Distancias con la misma indexacion que una matriz de n x n."""
+        if not isinstance(key, tuple):
+            if isinstance(key, (int, np.integer)):
+                return self.row(int(key))
+            return self[key, slice(None)]
+        u, v = key
+        if isinstance(u, (int, np.integer)):
+            if isinstance(v, (int, np.integer)):
+                return np.float64(self.item(int(u), int(v)))
+            return self.row(int(u))[v]
+        u, v = _as_index(u, self.n), _as_index(v, self.n)
+        if isinstance(key[1], slice) and u.ndim == 1:
+            u = u[:, None]  # dist[rows, :] devuelve una fila por indice
+        low, high = np.minimum(u, v), np.maximum(u, v)
+        # En la diagonal el indice cae en una posicion valida cualquiera,
+        # que luego se reemplaza por 0
+        w = self.data[self._offset[low] + high].astype(np.float64)
+        w[low == high] = 0
+        return w
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Construye la matriz densa, con memoria O(n^2)."""
+        full = np.stack([self.row(u) for u in range(self.n)])
+        return full if dtype is None else full.astype(dtype)
+
+    def share(self) -> tuple[PackedDistance, SharedMemory | None]:
+        """Copia las distancias a memoria compartida, ver shared.
+
+        Retorno:
+        =======
+        dist: PackedDistance
+            las mismas distancias en memoria compartida, que al copiarse a
+            otro proceso transfieren solo una referencia
+        shm: SharedMemory | None
+            el bloque de memoria compartida, que debe liberarse al terminar,
+            o None si las distancias ya se podian compartir (en cuyo caso
+            dist es self)
+        """
+        if self._shared is not None or SharedRef.of(self.data) is not None:
+            return self, None
+        data, shm, ref = share_array(self.data)
+        dist = PackedDistance(data, self.n)
+        dist._shared = ref
+        return dist, shm
+
+    def __getstate__(self) -> dict:
+        """Estado que se transfiere al copiar a otro proceso.
+
+        Si las distancias estan en memoria compartida o mapeadas desde un
+        archivo se transfiere una referencia en lugar de los datos.
+        """
+        state = dict(self.__dict__)
+        ref = self._shared or SharedRef.of(self.data)
+        if ref is not None:
+            state['data'] = ref
+        del state['_item'], state['_offsets']
+        state['_shm'] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Reconstruye las distancias, abriendo los datos compartidos."""
+        self.__dict__.update(state)
+        if isinstance(self.data, SharedRef):
+            self.data, self._shm = self.data.attach()
+        self._offsets = self._offset.tolist()
+        self._item = self.data.item
+
+
+def as_storage(values: np.ndarray, dtype: str) -> np.ndarray:
+    """Convierte distancias al tipo con el que se guardan.
+
+    Verifica que la conversion no pierda informacion: con int32 las
+    distancias deben ser enteras y caber en 32 bits.
+    """
+    values = np.asarray(values)
+    kind = _storage(dtype)
+    if kind.kind == "i" and values.dtype.kind != "i":
+        if not np.array_equal(values, np.rint(values)):
+            raise ValueError("las distancias no son enteras, "
+                             "se deben guardar como float32")
+    if kind.kind == "i" and values.size:
+        info = np.iinfo(kind)
+        if values.min() < info.min or values.max() > info.max:
+            raise ValueError(f"las distancias no caben en {dtype}")
+    return values.astype(kind, copy=False)
+
+
+def _storage(dtype: str) -> np.dtype:
+    """Tipo de NumPy de las distancias empaquetadas."""
+    if str(dtype) not in STORAGE_TYPES:
+        raise ValueError(f"tipo de almacenamiento no soportado: {dtype}")
+    return np.dtype(dtype)
+
+
+def _as_index(x, n: int) -> np.ndarray:
+    """Convierte un indice (entero, slice o arreglo) en arreglo de indices."""
+    if isinstance(x, slice):
+        return np.arange(n)[x]
+    return np.asarray(x)
+
+
+def _geo_radians(coords: np.ndarray) -> np.ndarray:
+    """Convierte coordenadas GEO de TSPLIB (grados.minutos) a radianes."""
+    degrees = np.trunc(coords)
+    return np.radians(degrees + (coords - degrees) * 5 / 3)
+
+
+def _weights(p: np.ndarray, q: np.ndarray, weight_type: str) -> np.ndarray:
+    """Calcula los pesos entre dos arreglos de puntos, con broadcasting.
+
+    Los puntos son las ultimas coordenadas de cada arreglo, en radianes
+    para el tipo GEO.
+    """
+    dx = p[..., 0] - q[..., 0]
+    dy = p[..., 1] - q[..., 1]
+    if weight_type == EUC_2D:
+        return np.floor(np.sqrt(dx * dx + dy * dy) + 0.5)
+    if weight_type == CEIL_2D:
+        return np.ceil(np.sqrt(dx * dx + dy * dy))
+    if weight_type == ATT:
+        r = np.sqrt((dx * dx + dy * dy) / 10)
+        t = np.floor(r + 0.5)
+        return np.where(t < r, t + 1, t)
+    if weight_type == GEO:
+        q1 = np.cos(dy)
+        q2 = np.cos(dx)
+        q3 = np.cos(p[..., 0] + q[..., 0])
+        cos_angle = np.clip(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1, 1)
+        return np.trunc(EARTH_RADIUS * np.arccos(cos_angle) + 1)
+    if weight_type == MAN_2D:
+        return np.floor(np.abs(dx) + np.abs(dy) + 0.5)
+    return np.floor(np.maximum(np.abs(dx), np.abs(dy)) + 0.5)
+
+
+def _euc_2d(x1: float, y1: float, x2: float, y2: float) -> float:
+    dx, dy = x1 - x2, y1 - y2
+    return float(int(sqrt(dx * dx + dy * dy) + 0.5))
+
+
+def _ceil_2d(x1: float, y1: float, x2: float, y2: float) -> float:
+    dx, dy = x1 - x2, y1 - y2
+    return float(ceil(sqrt(dx * dx + dy * dy)))
+
+
+def _att(x1: float, y1: float, x2: float, y2: float) -> float:
+    dx, dy = x1 - x2, y1 - y2
+    r = sqrt((dx * dx + dy * dy) / 10)
+    t = int(r + 0.5)
+    return float(t + 1 if t < r else t)
+
+
+def _geo(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    q1 = cos(lng1 - lng2)
+    q2 = cos(lat1 - lat2)
+    q3 = cos(lat1 + lat2)
+    cos_angle = min(max(0.5 * ((1 + q1) * q2 - (1 - q1) * q3), -1.0), 1.0)
+    return float(int(EARTH_RADIUS * acos(cos_angle) + 1))
+
+
+def _man_2d(x1: float, y1: float, x2: float, y2: float) -> float:
+    return float(int(abs(x1 - x2) + abs(y1 - y2) + 0.5))
+
+
+def _max_2d(x1: float, y1: float, x2: float, y2: float) -> float:
+    return float(int(max(abs(x1 - x2), abs(y1 - y2)) + 0.5))
+
+
+# Peso de una unica arista para cada tipo, sin pasar por NumPy
+_SCALAR = {EUC_2D: _euc_2d, CEIL_2D: _ceil_2d, ATT: _att, GEO: _geo,
+           MAN_2D: _man_2d, MAX_2D: _max_2d}
@@ -1,11 +1,47 @@
 """Este modulo se encarga de la lectura de archivos ".tsp".
 
-Requiere del paquete tsplib95.
+read_tsp requiere del paquete tsplib95, que se importa solo al usarla.
+read_tsp_native, read_tsp_lazy y read_tsp_packed usan en cambio un lector
+propio, que recorre el archivo una unica vez y carga las secciones de datos
+directamente en arreglos de NumPy, sin construir el grafo completo.
+El lector propio soporta:
+
+* NODE_COORD_SECTION, con distancias EUC_2D, CEIL_2D, ATT, GEO, MAN_2D o
+  MAX_2D calculadas a partir de las coordenadas.
+* EDGE_WEIGHT_SECTION de instancias EXPLICIT, en los formatos FULL_MATRIX,
+  UPPER_ROW, LOWER_ROW, UPPER_DIAG_ROW, LOWER_DIAG_ROW y sus equivalentes
+  por columnas.
+
+read_tsp_native y read_tsp_lazy pueden usar ademas un cache binario en disco, en la carpeta .cache
+junto a la instancia, identificado por el hash del contenido del archivo.
+Guarda las especificaciones y las coordenadas en un archivo .npz y la matriz
+de distancias en un archivo .npy, que se abre como memoria mapeada de solo
+lectura: las siguientes lecturas no parsean el archivo de texto, y varios
+procesos que abren el mismo cache comparten las paginas de la matriz.
 """
 
 from __future__ import annotations
-from tsplib95 import load
+from distance import LazyDistance, PackedDistance, WEIGHT_TYPES, as_storage
+from glob import escape, glob
+from hashlib import sha1
 from networkx import Graph
+from typing import TextIO
+import json
+import os
+import numpy as np
+
+CACHE_DIR = ".cache"  # carpeta del cache, junto a cada instancia
+SECTION_CHUNK = 1 << 22  # caracteres de una seccion que se parsean juntos
+
+# Formatos de EDGE_WEIGHT_SECTION: si recorren el triangulo inferior de la
+# matriz por filas (o el superior por columnas) y si incluyen la diagonal.
+# El triangulo superior por filas equivale al inferior por columnas.
+_TRIANGLES = {
+    "UPPER_ROW": (False, False), "LOWER_COL": (False, False),
+    "LOWER_ROW": (True, False), "UPPER_COL": (True, False),
+    "UPPER_DIAG_ROW": (False, True), "LOWER_DIAG_COL": (False, True),
+    "LOWER_DIAG_ROW": (True, True), "UPPER_DIAG_COL": (True, True),
+}
 
 
 def read_tsp(filename: str) -> tuple[Graph, dict[int, tuple[int, int]]]:
@@ -23,7 +59,329 @@ def read_tsp(filename: str) -> tuple[Graph, dict[int, tuple[int, int]]]:
     coords: dict[int, tuple[int, int]]
         diccionario con las coordenadas de cada ciudad.
     """
+    from tsplib95 import load
+
     problem = load(filename)
     coords = problem.node_coords
     G = problem.get_graph()
     return G, coords
+
+
+def read_tsp_native(filename: str, cache: bool = False
+                    ) -> tuple[np.ndarray, dict[int, tuple[float, float]]]:
+    """Lee un archivo en formato ".tsp" con el lector propio.
+
+    Argumentos:
+    ==========
+    filename: str
+        ruta de la instancia
+    cache: bool
+        si se usa el cache en disco, en cuyo caso la matriz es un
+        np.memmap de solo lectura
+
+    Retorna:
+    =======
+    dist: np.ndarray
+        matriz de n x n con las distancias entre las ciudades, indexada
+        desde 0
+    coords: dict[int, tuple[float, float]]
+        diccionario con las coordenadas de cada ciudad (vacio si la
+        instancia no tiene coordenadas).
+    """
+    if cache:
+        _, points, weights = _read_cache(filename, matrix=True)
+        return weights, _coords_dict(points)
+    spec, points, weights = parse_tsplib(filename)
+    if weights is None:
+        weights = np.asarray(_lazy_distance(filename, spec, points))
+    return weights, _coords_dict(points)
+
+
+def read_tsp_lazy(filename: str, cache_rows: int = 0, cache: bool = False
+                  ) -> tuple[LazyDistance, dict[int, tuple[int, int]]]:
+    """Lee un archivo en formato ".tsp" sin construir el grafo completo.
+
+    Solo conserva las coordenadas y el tipo de peso de la instancia, y las
+    distancias se calculan bajo demanda. Requiere que la instancia tenga
+    coordenadas en el plano (NODE_COORD_SECTION).
+
+    Argumentos:
+    ==========
+    filename: str
+        ruta de la instancia
+    cache_rows: int
+        cantidad maxima de filas de distancias guardadas en memoria
+    cache: bool
+        si se leen las coordenadas del cache en disco
+
+    Retorna:
+    =======
+    dist: LazyDistance
+        distancias entre las ciudades, indexadas desde 0
+    coords: dict[int, tuple[int, int]]
+        diccionario con las coordenadas de cada ciudad.
+    """
+    if cache:
+        spec, points, _ = _read_cache(filename, matrix=False)
+    else:
+        spec, points, _ = parse_tsplib(filename, weights=False)
+    dist = _lazy_distance(filename, spec, points, cache_rows)
+    return dist, _coords_dict(points)
+
+
+def read_tsp_packed(filename: str, dtype: str = "int32"
+                    ) -> tuple[PackedDistance, dict[int, tuple[float, float]]]:
+    """Lee un archivo en formato ".tsp" con las distancias empaquetadas.
+
+    Guarda solo el triangulo superior de la matriz de distancias, con
+    enteros o reales de 32 bits, sin construir nunca la matriz completa
+    (salvo para el formato FULL_MATRIX, que se lee entero). Las distancias
+    deben ser simetricas.
+
+    Argumentos:
+    ==========
+    filename: str
+        ruta de la instancia
+    dtype: str
+        tipo con el que se guardan las distancias (int32 o float32)
+
+    Retorna:
+    =======
+    dist: PackedDistance
+        distancias entre las ciudades, indexadas desde 0
+    coords: dict[int, tuple[float, float]]
+        diccionario con las coordenadas de cada ciudad (vacio si la
+        instancia no tiene coordenadas).
+    """
+    spec, points, weights = parse_tsplib(filename, packed=dtype)
+    if weights is None:
+        lazy = _lazy_distance(filename, spec, points)
+        weights = PackedDistance.from_rows(lazy.n, lazy.row, dtype)
+    return weights, _coords_dict(points)
+
+
+def parse_tsplib(filename: str, weights: bool = True,
+                 packed: str | None = None
+                 ) -> tuple[dict[str, str], np.ndarray | None,
+                            np.ndarray | PackedDistance | None]:
+    """Lee las especificaciones y las secciones de datos de un archivo TSPLIB.
+
+    Argumentos:
+    ==========
+    filename: str
+        ruta de la instancia
+    weights: bool
+        si se arma la matriz de EDGE_WEIGHT_SECTION (si no, se saltea)
+    packed: str | None
+        si se indica, la matriz de EDGE_WEIGHT_SECTION se empaqueta como
+        PackedDistance con ese tipo (int32 o float32)
+
+    Retorna:
+    =======
+    spec: dict[str, str]
+        especificaciones del encabezado, como {"DIMENSION": "76", ...}
+    coords: np.ndarray | None
+        matriz de n x 2 con las coordenadas de NODE_COORD_SECTION
+    weights: np.ndarray | PackedDistance | None
+        matriz de n x n de EDGE_WEIGHT_SECTION, simetrizada
+    """
+    spec, coords, matrix = {}, None, None
+    with open(filename) as file:
+        line = _next_line(file)
+        while line is not None and line != "EOF":
+            key, _, value = line.partition(":")
+            key = key.strip().upper()
+            if not key.endswith("_SECTION"):
+                spec[key] = value.strip()
+                line = _next_line(file)
+                continue
+            section = key == "EDGE_WEIGHT_SECTION" and weights
+            data, line = _read_section(file, packed if section else None)
+            n = int(spec["DIMENSION"])
+            if key == "NODE_COORD_SECTION":
+                rows = data.reshape(n, -1)
+                coords = np.empty((n, 2))
+                coords[rows[:, 0].astype(np.int64) - 1] = rows[:, 1:3]
+            elif section:
+                fmt = spec.get("EDGE_WEIGHT_FORMAT", "FULL_MATRIX").upper()
+                if packed is None:
+                    matrix = _weight_matrix(data, n, fmt, filename)
+                else:
+                    matrix = _packed_weights(data, n, fmt, filename)
+    return spec, coords, matrix
+
+
+def cache_paths(filename: str) -> tuple[str, str]:
+    """Determina los archivos del cache en disco de una instancia.
+
+    Argumentos:
+    ==========
+    filename: str
+        ruta de la instancia
+
+    Retorna:
+    =======
+    meta: str
+        ruta del .npz con las especificaciones y las coordenadas
+    matrix: str
+        ruta del .npy con la matriz de distancias
+    """
+    with open(filename, "rb") as file:
+        digest = sha1(file.read()).hexdigest()[:16]
+    folder = os.path.join(os.path.dirname(os.path.abspath(filename)),
+                          CACHE_DIR)
+    base = os.path.join(folder, f"{os.path.basename(filename)}.{digest}")
+    return base + ".npz", base + ".dist.npy"
+
+
+def _read_cache(filename: str, matrix: bool
+                ) -> tuple[dict[str, str], np.ndarray | None,
+                           np.ndarray | None]:
+    """Lee una instancia del cache en disco, creandolo si no existe.
+
+    Retorna lo mismo que parse_tsplib, pero la matriz de distancias (solo
+    si matrix es True) se calcula tambien para las instancias con
+    coordenadas y es un np.memmap de solo lectura.
+    """
+    meta, dist_path = cache_paths(filename)
+    weights = None
+    if os.path.exists(meta):
+        with np.load(meta) as data:
+            spec = json.loads(str(data["spec"]))
+            points = data["coords"] if data["coords"].size else None
+    else:
+        # El cache es de otra version del archivo o no existe
+        spec, points, weights = parse_tsplib(filename, weights=matrix)
+        prefix, digest = meta.rsplit(".", 2)[:2]
+        for old in glob(escape(prefix) + ".*"):
+            if digest not in old:
+                os.remove(old)
+        empty = np.empty((0, 2))
+        _atomic_save(meta, lambda f: np.savez(
+            f, spec=np.array(json.dumps(spec)),
+            coords=empty if points is None else points))
+    if not matrix:
+        return spec, points, None
+    if not os.path.exists(dist_path):
+        if weights is None and points is not None:
+            weights = np.asarray(_lazy_distance(filename, spec, points))
+        elif weights is None:
+            weights = parse_tsplib(filename)[2]
+        _atomic_save(dist_path, lambda f: np.save(f, weights))
+    return spec, points, np.load(dist_path, mmap_mode="r")
+
+
+def _atomic_save(path: str, write) -> None:
+    """Escribe un archivo del cache sin dejarlo a medio escribir.
+
+    Se escribe en un archivo temporal que luego reemplaza al definitivo,
+    de modo que otro proceso nunca lee un archivo incompleto.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as file:
+        write(file)
+    os.replace(tmp, path)
+
+
+def _next_line(file: TextIO) -> str | None:
+    """Siguiente linea no vacia del archivo, o None al terminar."""
+    for line in file:
+        line = line.strip()
+        if line:
+            return line
+    return None
+
+
+def _read_section(file: TextIO, dtype: str | None = None
+                  ) -> tuple[np.ndarray, str | None]:
+    """Lee los numeros de una seccion hasta la siguiente palabra clave.
+
+    Las lineas se parsean por bloques de a lo sumo SECTION_CHUNK
+    caracteres, de modo que nunca se arma el texto de toda la seccion.
+
+    Argumentos:
+    ==========
+    file: TextIO
+        archivo abierto, al comienzo de los datos de la seccion
+    dtype: str | None
+        tipo de almacenamiento al que se convierte cada bloque (ver
+        distance.as_storage), o None para float64
+
+    Retorna:
+    =======
+    data: np.ndarray
+        los numeros de la seccion, en orden
+    line: str | None
+        la linea con la siguiente palabra clave, o None al terminar
+    """
+    blocks, chunk, size = [], [], 0
+    line = None
+
+    def parse() -> None:
+        block = np.fromstring(" ".join(chunk), dtype=np.float64, sep=" ")
+        blocks.append(block if dtype is None else as_storage(block, dtype))
+        chunk.clear()
+
+    for raw in file:
+        raw = raw.strip()
+        if raw and raw[0].isalpha():
+            line = raw
+            break
+        chunk.append(raw)
+        size += len(raw)
+        if size >= SECTION_CHUNK:
+            parse()
+            size = 0
+    parse()
+    return blocks[0] if len(blocks) == 1 else np.concatenate(blocks), line
+
+
+def _weight_matrix(data: np.ndarray, n: int, fmt: str,
+                   filename: str) -> np.ndarray:
+    """Arma la matriz simetrica de n x n de una EDGE_WEIGHT_SECTION."""
+    if fmt == "FULL_MATRIX":
+        return data[:n * n].reshape(n, n).copy()
+    if fmt not in _TRIANGLES:
+        raise ValueError(f"{filename}: formato de pesos no soportado: {fmt}")
+    lower, diag = _TRIANGLES[fmt]
+    offset = 0 if diag else 1
+    if lower:
+        i, j = np.tril_indices(n, -offset)
+    else:
+        i, j = np.triu_indices(n, offset)
+    matrix = np.zeros((n, n))
+    matrix[i, j] = data[:len(i)]
+    matrix[j, i] = data[:len(i)]
+    return matrix
+
+
+def _packed_weights(data: np.ndarray, n: int, fmt: str,
+                    filename: str) -> PackedDistance:
+    """Empaqueta el triangulo superior de una EDGE_WEIGHT_SECTION."""
+    if fmt == "FULL_MATRIX":
+        return PackedDistance.from_matrix(data[:n * n].reshape(n, n),
+                                          data.dtype.name)
+    if fmt not in _TRIANGLES:
+        raise ValueError(f"{filename}: formato de pesos no soportado: {fmt}")
+    lower, diag = _TRIANGLES[fmt]
+    return PackedDistance.from_triangle(data, n, lower, diag)
+
+
+def _lazy_distance(filename: str, spec: dict[str, str],
+                   points: np.ndarray | None,
+                   cache_rows: int = 0) -> LazyDistance:
+    """Distancias bajo demanda a partir de las coordenadas."""
+    weight_type = spec.get("EDGE_WEIGHT_TYPE", "").upper()
+    if points is None or weight_type not in WEIGHT_TYPES:
+        raise ValueError(f"{filename}: las distancias de tipo {weight_type} "
+                         "no se pueden calcular a partir de coordenadas")
+    return LazyDistance(points, weight_type, cache_rows)
+
+
+def _coords_dict(points: np.ndarray | None
+                 ) -> dict[int, tuple[float, float]]:
+    """Coordenadas como diccionario, con las ciudades enumeradas de 1 a n."""
+    if points is None:
+        return {}
+    return dict(enumerate(map(tuple, points.tolist()), start=1))
@@ -11,28 +11,31 @@ import search
 import plot
 import problem
 
-# Algoritmos involucrados
-HILL_CLIMBING = "hill"
-HILL_CLIMBING_RANDOM_RESET = "hill_reset"
-TABU_SEARCH = "tabu"
-ALGO_NAMES = [HILL_CLIMBING, HILL_CLIMBING_RANDOM_RESET, TABU_SEARCH]
-
 
 def main() -> None:
     """Funcion principal."""
     # Parsear los argumentos de la linea de comandos
     args = parse.parse()
 
-    # Leer la instancia
-    G, coords = load.read_tsp(args.filename)
+    # Leer la instancia, sin construir el grafo completo: las distancias
+    # se cargan en una matriz, con --lazy se calculan bajo demanda y con
+    # --packed se guarda solo el triangulo superior
+    if args.lazy:
+        dist, coords = load.read_tsp_lazy(args.filename, args.cache_rows,
+                                          cache=args.cache)
+    elif args.packed:
+        dist, coords = load.read_tsp_packed(args.filename, dtype=args.packed)
+    else:
+        dist, coords = load.read_tsp_native(args.filename,
+                                              cache=args.cache)
 
     # Construir la instancia de TSP
-    p = problem.TSP(G)
+    p = problem.TSP(None, dist=dist, coords=coords)
 
-    # Construir las instancias de los algoritmos
-    algos = {HILL_CLIMBING: search.HillClimbing(),
-             HILL_CLIMBING_RANDOM_RESET: search.HillClimbingReset(),
-             TABU_SEARCH: search.Tabu()}
+    # Construir las instancias de los algoritmos (ver search.ALGORITHMS)
+    init = args.init
+    algos = {name: algo(init=init)
+             for name, algo in search.ALGORITHMS.items()}
 
     # Resolver el TSP con cada algoritmo
     for algo in algos.values():
@@ -43,12 +46,17 @@ def main() -> None:
     for name, algo in algos.items():
         print(algo.value, "%.2f" % algo.time, algo.niters, name, sep="\t\t")
 
-    # Graficar los tours
+    # Graficar los tours, salvo que la instancia no tenga coordenadas
+    # (por ejemplo, con la matriz de distancias explicita)
+    if not coords:
+        print("La instancia no tiene coordenadas: no se grafican los tours.")
+        return
     tours = {}
-    tours['init'] = (p.init, p.obj_val(p.init))  # estado inicial
+    init = p.initial_tour(init)
+    tours['init'] = (init, p.obj_val(init))  # estado inicial
     for name, algo in algos.items():
         tours[name] = (algo.tour, algo.value)
-    plot.show(G, coords, args.filename, tours)
+    plot.show(None, coords, args.filename, tours)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,8 @@
 """Este modulo se encarga del parseo de la linea de comandos."""
 
 from argparse import ArgumentParser
+from distance import STORAGE_TYPES
+from problem import INITS, IDENTITY
 
 
 def parse() -> ArgumentParser:
@@ -20,4 +22,29 @@ def parse() -> ArgumentParser:
                         metavar='filename.tsp',
                         help='path to input file')
 
+    # Agregamos los argumentos opcionales
+    parser.add_argument('--init',
+                        choices=INITS,
+                        default=IDENTITY,
+                        help='initial tour of every algorithm')
+    parser.add_argument('--lazy',
+                        action='store_true',
+                        help='compute distances on demand from the \
+                              coordinates instead of building the graph')
+    parser.add_argument('--cache-rows',
+                        type=int,
+                        default=0,
+                        help='with --lazy, number of distance rows kept in \
+                              memory (0 to keep none)')
+    parser.add_argument('--packed',
+                        nargs='?',
+                        const='int32',
+                        choices=STORAGE_TYPES,
+                        help='store only the upper triangle of the symmetric \
+                              distance matrix, as int32 (default) or float32')
+    parser.add_argument('--cache',
+                        action='store_true',
+                        help='read the instance through the binary cache \
+                              stored next to it')
+
     return parser.parse_args()
@@ -13,7 +13,15 @@ Formulacion de estado completo para el Problema del Viajante:
 
 * Estado inicial.
     Consideramos el estado inicial [0,1,2,...,n-1,0].
-    Pero cualquier estado puede ser inicial.
+    Pero cualquier estado puede ser inicial. Ademas del identico se
+    ofrecen tours constructivos, que dejan a las busquedas mucho mas cerca
+    de un optimo local (ver TSP.initial_tour):
+    * vecino mas cercano: desde la ciudad 0, ir siempre a la ciudad mas
+      cercana sin visitar.
+    * greedy: agregar las aristas de menor a mayor peso mientras no cierren
+      un ciclo ni dejen una ciudad con grado 3.
+    * curva de Hilbert: visitar las ciudades en el orden en que las recorre
+      una curva de Hilbert sobre el plano (requiere coordenadas).
 
 * Acciones.
     Consideramos como accion el intercambio de dos aristas del tour.
@@ -24,10 +32,22 @@ Formulacion de estado completo para el Problema del Viajante:
     con 0 <= i <= n-3, i+2 <= j <= n-1.
     Notar que las aristas elegidas no deben ser adyacentes.
 
+    Ademas de 2-opt se ofrecen dos familias de intercambio de tramos,
+    representadas como ternas (i,j,k) con 0 <= i < j < k <= n-1:
+    intercambiar el tramo [v_i+1,...,v_j] con el tramo [v_j+1,...,v_k].
+    * Or-opt: alguno de los dos tramos tiene a lo sumo 3 ciudades,
+      es decir, se reubica un tramo corto en otra parte del tour.
+    * 3-opt restringido: ambos tramos caben en una ventana de
+      a lo sumo 30 posiciones (k - i <= 30).
+    Cada busqueda elige que familias usar. Las dos familias se superponen,
+    y al combinarlas cada accion se considera una unica vez.
+
 * Resultado.
     resultado([v_0,...,v_n], (i,j)) =
         [v_0,...,v_i] ++ [v_j,...,v_i+1] ++ [v_j+1,...,v_n]
     Notar que [v_j,...,v_i+1] es el reverso de [v_i+1,...,v_j]
+    resultado([v_0,...,v_n], (i,j,k)) =
+        [v_0,...,v_i] ++ [v_j+1,...,v_k] ++ [v_i+1,...,v_j] ++ [v_k+1,...,v_n]
 
 * Funcion objetivo:
     obj_val([v_0,v_1,...,v_n-1,v_n]) =
@@ -37,13 +57,41 @@ Formulacion de estado completo para el Problema del Viajante:
 """
 
 from __future__ import annotations
-from typing import TypeVar
+from contextlib import contextmanager
+from typing import Iterator, TypeVar, Union
 from networkx import Graph
-from random import shuffle
+from random import Random, shuffle
+import random as _random
+import numpy as np
+from distance import PackedDistance
+from shared import SharedRef, share_array
+from spatial import KDTree
+from tour import Tour
 
 State = TypeVar('State')
 Action = TypeVar('Action')
 
+# Familias de movimientos del TSP
+TWO_OPT = "2opt"
+OR_OPT = "oropt"
+THREE_OPT = "3opt"
+MOVES = (TWO_OPT, OR_OPT, THREE_OPT)
+Moves = Union[str, tuple[str, ...]]
+
+OR_OPT_SEGMENT = 3  # largo maximo del tramo que se reubica en Or-opt
+THREE_OPT_WINDOW = 30  # largo maximo del tramo afectado por 3-opt
+
+# Tours iniciales del TSP
+IDENTITY = "identity"
+NEAREST_NEIGHBOR = "nearest"
+GREEDY = "greedy"
+SPACE_FILLING = "hilbert"
+INITS = (IDENTITY, NEAREST_NEIGHBOR, GREEDY, SPACE_FILLING)
+
+CANDIDATES = 10  # vecinos cercanos considerados al construir tours
+HILBERT_ORDER = 16  # la curva de Hilbert recorre una grilla de 2^16 x 2^16
+NEIGHBOR_BLOCK = 256  # filas de distancias que se recorren juntas
+
 
 class OptProblem:
     """Clase que representa un problema de optimizacion general."""
@@ -60,6 +108,22 @@ class OptProblem:
         """Determina el estado resultado de aplicar una accion a un estado."""
         raise NotImplementedError
 
+    def apply(self, state: State, action: Action) -> None:
+        """Aplica una accion a un estado, modificandolo en el lugar.
+
+        Es la version sin copias de result: luego de llamarlo, state es
+        igual a lo que hubiera devuelto result(state, action).
+        """
+        raise NotImplementedError
+
+    def undo(self, state: State, action: Action) -> None:
+        """Deshace en el lugar una accion aplicada con apply."""
+        raise NotImplementedError
+
+    def inverse(self, action: Action) -> Action:
+        """Devuelve la accion que deshace a action."""
+        raise NotImplementedError
+
     def obj_val(self, state: State) -> float:
         """Determina el valor objetivo de un estado."""
         raise NotImplementedError
@@ -72,55 +136,140 @@ class OptProblem:
         """
         raise NotImplementedError
 
+    def val_diff_array(self, state: State) -> np.ndarray:
+        """Version vectorizada de val_diff, alineada con las acciones."""
+        raise NotImplementedError
+
+    def best_actions(self, diff: np.ndarray) -> list[Action]:
+        """Determina las acciones con maxima diferencia en un arreglo."""
+        raise NotImplementedError
+
 
 class TSP(OptProblem):
     """Subclase que representa al Problema del Viajante (TSP).
 
     Un estado es una lista de enteros: list[int].
     Una accion es un par de enteros: tuple[int,int].
+
+    Las distancias se guardan en una matriz densa self.dist de n x n,
+    indexada desde 0, que se construye una unica vez. De esta forma la
+    evaluacion de tours y de movimientos se reduce a indexar un arreglo,
+    sin recorrer los diccionarios del grafo.
+
+    Para instancias grandes con coordenadas, self.dist puede ser en cambio
+    un distance.LazyDistance, que calcula cada distancia bajo demanda con
+    memoria O(n) y se indexa igual que la matriz densa. En ese caso no hace
+    falta el grafo. Para instancias grandes sin coordenadas (con la matriz
+    explicita), self.dist puede ser un distance.PackedDistance, que guarda
+    solo el triangulo superior como enteros o reales de 32 bits.
+
+    La matriz densa tambien puede ser un np.memmap de solo lectura (por
+    ejemplo, la del cache de load.read_tsp_native) o estar en memoria
+    compartida (ver shared). En ambos casos, al copiar la instancia a otro
+    proceso se transfiere solo una referencia a la matriz y no sus datos,
+    de modo que varios procesos comparten una unica copia.
     """
 
-    def __init__(self, G: Graph) -> None:
+    def __init__(self, G: Graph | None, dist: np.ndarray | None = None,
+                 coords: dict[int, tuple[float, float]] | None = None) -> None:
         """Construye una instancia de TSP.
 
         Argumentos:
         ==========
-        G: Graph
+        G: Graph | None
             grafo con los datos del problema
             los nodos del grafo se enumeran de 1 a n, ¡cuidado!
+            puede ser None si se indica dist
+        dist: np.ndarray | LazyDistance | PackedDistance | None
+            matriz de distancias de n x n indexada desde 0 (opcional),
+            si no se indica se construye a partir de G
+        coords: dict[int, tuple[float, float]] | None
+            coordenadas de cada ciudad, enumeradas de 1 a n (opcional)
         """
+        if G is None and dist is None:
+            raise ValueError("se necesita el grafo o las distancias")
         self.G = G
-        self.init = [i for i in range(0, G.number_of_nodes())]
+        self.n = G.number_of_nodes() if G is not None else len(dist)
+        self.dist = distance_matrix(G) if dist is None else dist
+        self.coords = None  # coordenadas como arreglo de n x 2
+        if coords:
+            self.coords = np.array([coords[u] for u in range(1, self.n + 1)],
+                                   dtype=np.float64)
+        self._neighbors = {}  # listas de vecinos cercanos, ver neighbors
+        self._kdtree = None  # indice espacial, ver spatial_index
+        self._shared = None  # referencia a dist en memoria compartida
+        self._shm = None  # bloque de memoria compartida abierto, ver shared
+        self.init = [i for i in range(0, self.n)]
         self.init.append(0)
+        self._act_arrays = {}  # acciones como arreglos, ver action_arrays
+        self._move_arrays = {}  # acciones sin repetir, ver move_arrays
+        self._act_index = {}  # posicion de cada accion, ver action_index
+        self._acts = {}  # acciones como lista, ver actions
 
-    def actions(self, state: list[int]) -> list[tuple[int, int]]:
+    def actions(self, state: list[int],
+                moves: Moves = TWO_OPT) -> list[tuple[int, ...]]:
         """Determina la lista de acciones que se pueden aplicar a un estado.
 
+        Las acciones no dependen del estado, solo de la cantidad de
+        ciudades, por lo que la lista se construye una unica vez por
+        instancia y se comparte entre todas las llamadas. No debe
+        modificarse.
+
         Argumentos:
         ==========
         state: list[int]
             un estado
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos (TWO_OPT, OR_OPT, THREE_OPT)
 
         Retorno:
         =======
-        act: list[tuple[int, int]]
+        act: list[tuple[int, ...]]
             lista de acciones
         """
-        act = []
-        for i in range(0, self.G.number_of_nodes() - 2):
-            for j in range(i + 2, self.G.number_of_nodes()):
-                if (j + 1) % self.G.number_of_nodes() != i:
-                    act.append((i, j))
-        return act
+        moves = _as_moves(moves)
+        if moves not in self._acts:
+            self._acts[moves] = [
+                a for _, arrays in self.move_arrays(moves)
+                for a in zip(*(x.tolist() for x in arrays))
+            ]
+        return self._acts[moves]
+
+    def iter_actions(self, state: list[int], start: int = 0,
+                     stop: int | None = None,
+                     moves: Moves = TWO_OPT) -> Iterator[tuple[int, ...]]:
+        """Itera las acciones de self.actions(state) entre start y stop.
+
+        A diferencia de self.actions(state) no construye ninguna lista,
+        por lo que conviene cuando solo se necesita un subconjunto.
+
+        Argumentos:
+        ==========
+        state: list[int]
+            un estado
+        start: int
+            posicion de la primera accion
+        stop: int | None
+            posicion siguiente a la ultima accion (por defecto, todas)
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos
+
+        Retorno:
+        =======
+        it: Iterator[tuple[int, ...]]
+            iterador de acciones
+        """
+        for k in range(start, self.nactions(moves) if stop is None else stop):
+            yield self.action(k, moves)
 
-    def result(self, state: list[int], action: tuple[int, int]) -> list[int]:
+    def result(self, state: list[int], action: tuple[int, ...]) -> list[int]:
         """Determina el estado que resulta de aplicar una accion a un estado.
 
         Argumentos:
         ==========
         state: list[int]
             un estado
-        action: tuple[int, int]
+        action: tuple[int, ...]
             una accion de self.acciones(state)
 
         Retorno:
@@ -129,10 +278,58 @@ class TSP(OptProblem):
             estado sucesor
         """
         succ = list(state)  # copy of the current state
-        i, j = action
-        succ[i + 1: j+1] = state[i + 1: j+1][::-1]  # reverse
+        if len(action) == 2:
+            i, j = action
+            succ[i + 1: j+1] = state[i + 1: j+1][::-1]  # reverse
+        else:
+            i, j, k = action
+            succ[i + 1: k+1] = state[j + 1: k+1] + state[i + 1: j+1]  # swap
         return succ
 
+    def apply(self, state: list[int], action: tuple[int, ...]) -> None:
+        """Aplica una accion a un estado, modificandolo en el lugar.
+
+        Solo se copia el tramo afectado por la accion, nunca el tour entero.
+
+        Argumentos:
+        ==========
+        state: list[int]
+            un estado, que se modifica
+        action: tuple[int, ...]
+            una accion de self.acciones(state)
+        """
+        if len(action) == 2:
+            i, j = action
+            state[i + 1: j+1] = state[j: i: -1]  # reverse
+        else:
+            i, j, k = action
+            state[i + 1: k+1] = state[j + 1: k+1] + state[i + 1: j+1]
+
+    def undo(self, state: list[int], action: tuple[int, ...]) -> None:
+        """Deshace en el lugar una accion aplicada con self.apply.
+
+        Argumentos:
+        ==========
+        state: list[int]
+            un estado al que se le aplico la accion, que se modifica
+        action: tuple[int, ...]
+            la accion aplicada
+        """
+        self.apply(state, self.inverse(action))
+
+    def inverse(self, action: tuple[int, ...]) -> tuple[int, ...]:
+        """Devuelve la accion que deshace a action.
+
+        Invertir un tramo es involutivo, por lo que una accion 2-opt es su
+        propia inversa. Intercambiar los tramos [v_i+1..v_j] y [v_j+1..v_k]
+        se deshace intercambiando los tramos resultantes, es decir, con la
+        accion (i, i+k-j, k), que pertenece a la misma familia.
+        """
+        if len(action) == 2:
+            return action
+        i, j, k = action
+        return i, i + k - j, k
+
     def obj_val(self, state: list[int]) -> float:
         """Determina el valor objetivo de un estado.
 
@@ -146,14 +343,11 @@ class TSP(OptProblem):
         value: float
             valor objetivo
         """
-        value = 0
-        for i in range(0, self.G.number_of_nodes()):
-            u = state[i]+1  # origen
-            v = state[i+1]+1  # destino
-            value -= self.G.get_edge_data(u, v)['weight']
-        return value
+        tour = np.asarray(state)
+        return -float(self.dist[tour[:-1], tour[1:]].sum())
 
-    def val_diff(self, state: list[int]) -> dict[tuple[int, int], float]:
+    def val_diff(self, state: list[int],
+                 moves: Moves = TWO_OPT) -> dict[tuple[int, ...], float]:
         """Determina la diferencia de valor objetivo al aplicar cada accion.
 
         Para cada accion A de self.actions(state), determina la diferencia
@@ -167,36 +361,687 @@ class TSP(OptProblem):
         ==========
         state: list[int]
             un estado
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos
 
         Retorno:
         =======
-        diff: dict[tuple[int, int], float]
+        diff: dict[tuple[int, ...], float]
             diccionario con las diferencias de valor objetivo
         """
-        diff = {}
-        for a in self.actions(state):
-            i, j = a
-            v1 = state[i]+1  # origen de i
-            v2 = state[i+1]+1  # destino de i
-            v3 = state[j]+1  # origen de j
-            v4 = state[j+1]+1  # destino de j
-            distl1l2 = self.G.get_edge_data(v1, v2)['weight']
-            distl3l4 = self.G.get_edge_data(v3, v4)['weight']
-            distl1l3 = self.G.get_edge_data(v1, v3)['weight']
-            distl2l4 = self.G.get_edge_data(v2, v4)['weight']
-            diff[a] = distl1l2 + distl3l4 - distl1l3 - distl2l4
-        return diff
-
-    def random_reset(self) -> list[int]:
+        return dict(zip(self.actions(state, moves),
+                        self.val_diff_array(state, moves).tolist()))
+
+    def delta(self, state: list[int], action: tuple[int, ...]) -> float:
+        """Determina la diferencia de valor objetivo de una unica accion.
+
+        Equivale a self.val_diff(state)[action] pero se calcula en O(1).
+
+        Argumentos:
+        ==========
+        state: list[int]
+            un estado
+        action: tuple[int, ...]
+            una accion de cualquier familia
+
+        Retorno:
+        =======
+        diff: float
+            diferencia de valor objetivo
+        """
+        d = self.dist.item  # acceso escalar sin crear escalares de NumPy
+        if len(action) == 2:
+            i, j = action
+            v1, v2, v3, v4 = state[i], state[i+1], state[j], state[j+1]
+            return d(v1, v2) + d(v3, v4) - d(v1, v3) - d(v2, v4)
+        i, j, k = action
+        v1, v2, v3, v4 = state[i], state[i+1], state[j], state[j+1]
+        v5, v6 = state[k], state[k+1]
+        return (d(v1, v2) + d(v3, v4) + d(v5, v6)
+                - d(v1, v4) - d(v5, v2) - d(v3, v6))
+
+    def action_arrays(self, family: str = TWO_OPT) -> tuple[np.ndarray, ...]:
+        """Devuelve las acciones de una familia como arreglos de indices.
+
+        El k-esimo elemento de cada arreglo corresponde a la k-esima accion
+        de self.actions(state, family), en el mismo orden. Los arreglos se
+        calculan una unica vez por instancia y se comparten entre todas las
+        busquedas, por lo que no deben modificarse.
+
+        Argumentos:
+        ==========
+        family: str
+            familia de movimientos (TWO_OPT, OR_OPT o THREE_OPT)
+
+        Retorno:
+        =======
+        i, j[, k]: tuple[np.ndarray, ...]
+            arreglos con las aristas que intercambia cada accion
+        """
+        if family not in self._act_arrays:
+            if family == TWO_OPT:
+                i, j = np.triu_indices(self.n, k=2)
+                keep = (j + 1) % self.n != i  # descartar la accion (0, n-1)
+                arrays = (i[keep], j[keep])
+            elif family == OR_OPT:
+                arrays = _or_opt_triples(self.n, OR_OPT_SEGMENT)
+            elif family == THREE_OPT:
+                arrays = _window_triples(self.n, THREE_OPT_WINDOW)
+            else:
+                raise ValueError(f"familia de movimientos desconocida: {family}")
+            self._act_arrays[family] = tuple(x.astype(np.int32)
+                                             for x in arrays)
+        return self._act_arrays[family]
+
+    def move_arrays(self, moves: Moves = TWO_OPT
+                    ) -> list[tuple[str, tuple[np.ndarray, ...]]]:
+        """Devuelve las acciones de una o varias familias, sin repetir.
+
+        Las familias de intercambio de tramos se superponen: la ventana de
+        3-opt contiene acciones Or-opt. Cada familia aporta solo las
+        acciones que no estan en las familias anteriores de moves, de modo
+        que cada accion aparece una unica vez en self.actions(state, moves).
+
+        Argumentos:
+        ==========
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos
+
+        Retorno:
+        =======
+        arrays: list[tuple[str, tuple[np.ndarray, ...]]]
+            cada familia con los arreglos de sus acciones, como en
+            self.action_arrays(family)
+        """
+        moves = _as_moves(moves)
+        if moves not in self._move_arrays:
+            parts, seen = [], []
+            for family in moves:
+                arrays = self.action_arrays(family)
+                if len(arrays) == 3:
+                    keys = _triple_keys(arrays, self.n)
+                    if seen:
+                        keep = ~np.isin(keys, np.concatenate(seen))
+                        if not keep.all():
+                            arrays = tuple(x[keep] for x in arrays)
+                            keys = keys[keep]
+                    seen.append(keys)
+                parts.append((family, arrays))
+            self._move_arrays[moves] = parts
+        return self._move_arrays[moves]
+
+    def nactions(self, moves: Moves = TWO_OPT) -> int:
+        """Determina la cantidad de acciones de una o varias familias."""
+        return sum(len(arrays[0]) for _, arrays in self.move_arrays(moves))
+
+    def action(self, k: int, moves: Moves = TWO_OPT) -> tuple[int, ...]:
+        """Devuelve la k-esima accion de self.actions(state, moves)."""
+        for _, arrays in self.move_arrays(moves):
+            if k < len(arrays[0]):
+                return tuple(int(x[k]) for x in arrays)
+            k -= len(arrays[0])
+        raise IndexError(k)
+
+    def action_index(self, action: tuple[int, ...],
+                     moves: Moves = TWO_OPT) -> int:
+        """Devuelve la posicion de una accion dentro de self.actions(state).
+
+        Es la inversa de self.action(k, moves). Para 2-opt se calcula en
+        O(1) con una formula cerrada, y para las demas familias con un
+        diccionario que se construye una unica vez.
+        """
+        moves = _as_moves(moves)
+        offset = 0
+        for family, arrays in self.move_arrays(moves):
+            if family == TWO_OPT and len(action) == 2:
+                i, j = action
+                k = i * (self.n - 2) - i * (i - 1) // 2 + (j - i - 2)
+                return offset + (k - 1 if i > 0 else k)
+            if family != TWO_OPT and len(action) == 3:
+                # las acciones de una familia dependen de las familias
+                # anteriores de moves, ver move_arrays
+                key = (moves, family)
+                if key not in self._act_index:
+                    self._act_index[key] = {
+                        a: k for k, a in
+                        enumerate(zip(*(x.tolist() for x in arrays)))}
+                if action in self._act_index[key]:
+                    return offset + self._act_index[key][action]
+            offset += len(arrays[0])
+        raise ValueError(f"accion desconocida: {action}")
+
+    def val_diff_array(self, state: list[int],
+                       moves: Moves = TWO_OPT) -> np.ndarray:
+        """Determina la diferencia de valor objetivo de todas las acciones.
+
+        Es la version vectorizada de self.val_diff(state): en lugar de un
+        diccionario devuelve un arreglo alineado con self.actions(state,
+        moves), calculado con una expresion de NumPy por familia.
+
+        Argumentos:
+        ==========
+        state: list[int]
+            un estado
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos
+
+        Retorno:
+        =======
+        diff: np.ndarray
+            arreglo con las diferencias de valor objetivo
+        """
+        tour = np.asarray(state)
+        orig = tour[:-1]  # origen de cada arista del tour
+        dest = tour[1:]  # destino de cada arista del tour
+        edge = self.dist[orig, dest]  # largo de cada arista del tour
+        diffs = []
+        for family, arrays in self.move_arrays(moves):
+            if family == TWO_OPT:
+                i, j = arrays
+                diffs.append(edge[i] + edge[j]
+                             - self.dist[orig[i], orig[j]]
+                             - self.dist[dest[i], dest[j]])
+            else:
+                i, j, k = arrays
+                diffs.append(edge[i] + edge[j] + edge[k]
+                             - self.dist[orig[i], dest[j]]
+                             - self.dist[orig[k], dest[i]]
+                             - self.dist[orig[j], dest[k]])
+        return diffs[0] if len(diffs) == 1 else np.concatenate(diffs)
+
+    def best_actions(self, diff: np.ndarray,
+                     moves: Moves = TWO_OPT) -> list[tuple[int, ...]]:
+        """Devuelve las acciones que alcanzan la maxima diferencia.
+
+        Argumentos:
+        ==========
+        diff: np.ndarray
+            arreglo devuelto por self.val_diff_array(state, moves)
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos
+
+        Retorno:
+        =======
+        acts: list[tuple[int, ...]]
+            acciones empatadas en la maxima diferencia de valor objetivo
+        """
+        ties = np.flatnonzero(diff == diff.max())
+        return [self.action(k, moves) for k in ties.tolist()]
+
+    def __getstate__(self) -> dict:
+        """Estado que se transfiere al copiar la instancia a otro proceso.
+
+        No incluye el grafo, que solo se usa para construir la matriz de
+        distancias, ni las estructuras que se recalculan bajo demanda. Si la
+        matriz esta en memoria compartida o mapeada desde un archivo, se
+        transfiere una referencia en lugar de los datos.
+        """
+        state = dict(self.__dict__)
+        state['G'], state['_kdtree'], state['_shm'] = None, None, None
+        state['_act_arrays'], state['_act_index'], state['_acts'] = {}, {}, {}
+        state['_move_arrays'] = {}
+        ref = self._shared or SharedRef.of(self.dist)
+        if ref is not None:
+            state['dist'] = ref
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Reconstruye la instancia, abriendo la matriz compartida."""
+        self.__dict__.update(state)
+        if isinstance(self.dist, SharedRef):
+            ref = self.dist
+            self.dist, self._shm = ref.attach()
+            self._shared = ref if ref.name is not None else None
+
+    @contextmanager
+    def shared(self) -> Iterator[TSP]:
+        """Pasa la matriz de distancias a memoria compartida.
+
+        Se usa en un bloque with alrededor de un pool de procesos: dentro
+        del bloque la matriz se copia una unica vez a memoria compartida, y
+        cada proceso que recibe la instancia lee esa misma copia. Al salir
+        del bloque se vuelve a la matriz original y se libera la memoria
+        compartida, por lo que los procesos deben haber terminado.
+
+        Si la matriz ya se puede compartir (un np.memmap de un archivo o una
+        matriz en memoria compartida) o se calcula bajo demanda (un
+        LazyDistance), no hace nada. Un PackedDistance se comparte igual que
+        la matriz densa.
+        """
+        dist, shm = self.dist, None
+        if isinstance(dist, PackedDistance):
+            self.dist, shm = dist.share()
+        elif (self._shared is None and isinstance(dist, np.ndarray)
+              and SharedRef.of(dist) is None):
+            self.dist, shm, self._shared = share_array(dist)
+        if shm is None:
+            yield self
+            return
+        try:
+            yield self
+        finally:
+            self.dist, self._shared = dist, None
+            shm.close()
+            shm.unlink()
+
+    def spatial_index(self) -> KDTree | None:
+        """Devuelve el KD-tree de las coordenadas de las ciudades.
+
+        Se construye una unica vez, en O(n log n). Si no se conocen las
+        coordenadas devuelve None.
+        """
+        if self._kdtree is None and self.coords is not None:
+            self._kdtree = KDTree(self.coords)
+        return self._kdtree
+
+    def nearest_cities(self, c: int, k: int) -> np.ndarray:
+        """Determina las k ciudades geometricamente mas cercanas a c.
+
+        Argumentos:
+        ==========
+        c: int
+            una ciudad
+        k: int
+            cantidad de ciudades
+
+        Retorno:
+        =======
+        cities: np.ndarray
+            las ciudades, sin incluir a c, ordenadas por cercania
+        """
+        tree = self._require_index()
+        k = min(k, self.n - 1)
+        _, idx = tree.query(self.coords[c], k + 1)
+        return idx[idx != c][:k]
+
+    def cities_within(self, c: int, r: float) -> np.ndarray:
+        """Determina las ciudades a distancia euclidea a lo sumo r de c.
+
+        Argumentos:
+        ==========
+        c: int
+            una ciudad
+        r: float
+            radio de la consulta
+
+        Retorno:
+        =======
+        cities: np.ndarray
+            las ciudades, sin incluir a c, ordenadas por cercania
+        """
+        idx = self._require_index().query_radius(self.coords[c], r)
+        return idx[idx != c]
+
+    def _require_index(self) -> KDTree:
+        """Devuelve el KD-tree, que requiere coordenadas."""
+        tree = self.spatial_index()
+        if tree is None:
+            raise ValueError("las consultas espaciales requieren coordenadas")
+        return tree
+
+    def neighbors(self, k: int) -> np.ndarray:
+        """Determina las k ciudades mas cercanas a cada ciudad.
+
+        Los candidatos se eligen por cercania geometrica con el KD-tree, en
+        O(n log n), cuando se conocen las coordenadas, y por la matriz de
+        distancias en caso contrario.
+        Cada lista queda ordenada por distancia creciente. El resultado se
+        calcula una unica vez por cada k y no debe modificarse.
+
+        Argumentos:
+        ==========
+        k: int
+            cantidad de vecinos por ciudad
+
+        Retorno:
+        =======
+        neigh: np.ndarray
+            matriz de n x k, la fila u tiene los vecinos de la ciudad u
+        """
+        k = min(k, self.n - 1)
+        if k not in self._neighbors:
+            if self.coords is not None:
+                neigh = self.spatial_index().knn(k)
+            else:
+                # Recorremos la matriz por bloques de filas, para no armar
+                # una copia completa cuando no es una matriz densa
+                neigh = np.empty((self.n, k), dtype=np.int64)
+                for a in range(0, self.n, NEIGHBOR_BLOCK):
+                    b = min(a + NEIGHBOR_BLOCK, self.n)
+                    near = np.array(self.dist[a:b], dtype=np.float64)
+                    # una ciudad no es su vecina
+                    near[np.arange(b - a), np.arange(a, b)] = np.inf
+                    neigh[a:b] = np.argpartition(near, k - 1, axis=1)[:, :k]
+            rows = np.arange(self.n)[:, None]
+            order = np.argsort(self.dist[rows, neigh], axis=1, kind='stable')
+            neigh = np.take_along_axis(neigh, order, axis=1)
+            self._neighbors[k] = neigh.astype(np.int32)
+        return self._neighbors[k]
+
+    def random_action(self, rng: Random | None = None,
+                      family: str = TWO_OPT) -> tuple[int, ...]:
+        """Elige una accion al azar con probabilidad uniforme.
+
+        Las acciones 2-opt se sortean directamente en O(1), sin construir
+        el conjunto de acciones. Las demas familias se sortean sobre sus
+        arreglos de acciones.
+
+        Argumentos:
+        ==========
+        rng: Random | None
+            generador de numeros aleatorios (por defecto, el del modulo random)
+        family: str
+            familia de movimientos
+
+        Retorno:
+        =======
+        action: tuple[int, ...]
+            una accion de self.actions(state, family)
+        """
+        rng = rng or _random
+        if family != TWO_OPT:
+            return self.action(rng.randrange(self.nactions(family)), family)
+        while True:
+            i, j = rng.randrange(self.n), rng.randrange(self.n)
+            if i > j:
+                i, j = j, i
+            if j - i >= 2 and (i > 0 or j < self.n - 1):
+                return i, j
+
+    def random_reset(self, rng: Random | None = None) -> list[int]:
         """Devuelve un estado del TSP con un tour aleatorio.
-        
+
+        Argumentos:
+        ==========
+        rng: Random | None
+            generador de numeros aleatorios (por defecto, el del modulo random)
+
         Retorno:
         =======
         state: list[int]
             un estado
         """
-        state = [i for i in range(1, self.G.number_of_nodes())]
-        shuffle(state)  # mezclar la lista
+        state = [i for i in range(1, self.n)]
+        (rng.shuffle if rng is not None else shuffle)(state)  # mezclar la lista
         state.append(0)  # agregar a 0 como inicio del tour
         state.insert(0, 0)  # agregar a 0 como fin del tour
         return state
+
+    def initial_tour(self, method: str = IDENTITY) -> list[int]:
+        """Construye un estado inicial del TSP.
+
+        Argumentos:
+        ==========
+        method: str
+            IDENTITY, NEAREST_NEIGHBOR, GREEDY o SPACE_FILLING
+
+        Retorno:
+        =======
+        state: list[int]
+            un estado
+        """
+        if method == IDENTITY:
+            return list(self.init)
+        if method == NEAREST_NEIGHBOR:
+            return self.nearest_neighbor_tour()
+        if method == GREEDY:
+            return self.greedy_tour()
+        if method == SPACE_FILLING:
+            return self.space_filling_tour()
+        raise ValueError(f"tour inicial desconocido: {method}")
+
+    def nearest_neighbor_tour(self, start: int = 0) -> list[int]:
+        """Construye un tour con la heuristica del vecino mas cercano.
+
+        La siguiente ciudad se busca primero entre los vecinos cercanos de
+        la ciudad actual, y solo si todos fueron visitados se busca la mas
+        cercana sin visitar (con el KD-tree, si se conocen las coordenadas).
+
+        Argumentos:
+        ==========
+        start: int
+            ciudad de partida
+
+        Retorno:
+        =======
+        state: list[int]
+            un estado
+        """
+        neigh = self.neighbors(CANDIDATES).tolist()
+        unvisited = np.ones(self.n, dtype=bool)
+        tree = self._free_index(unvisited)
+        self._take(start, unvisited, tree)
+        order = [start]
+        current = start
+        for _ in range(self.n - 1):
+            for c in neigh[current]:
+                if unvisited[c]:
+                    break
+            else:
+                c = self._closest(current, unvisited, tree)
+            self._take(c, unvisited, tree)
+            order.append(c)
+            current = c
+        return Tour(order).to_state()
+
+    def greedy_tour(self) -> list[int]:
+        """Construye un tour con la heuristica greedy de aristas.
+
+        Recorre las aristas hacia los vecinos cercanos de menor a mayor peso
+        y agrega las que no cierran un ciclo ni dejan una ciudad con grado 3.
+        Los caminos que quedan se unen yendo desde el extremo del camino
+        actual al extremo libre mas cercano.
+
+        Retorno:
+        =======
+        state: list[int]
+            un estado
+        """
+        n = self.n
+        if n < 3:
+            return list(self.init)
+        neigh = self.neighbors(CANDIDATES)
+        u = np.repeat(np.arange(n), neigh.shape[1])
+        v = neigh.ravel()
+        # Cada arista una sola vez, aunque aparezca en ambas listas
+        edges = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+        u, v = edges // n, edges % n
+        w = self.dist[u, v]
+        ranking = np.argsort(w, kind='stable')
+
+        degree = [0] * n
+        adj = [[] for _ in range(n)]
+        parent = list(range(n))  # conjuntos disjuntos de los caminos
+
+        def find(a: int) -> int:
+            while parent[a] != a:
+                parent[a] = parent[parent[a]]
+                a = parent[a]
+            return a
+
+        for a, b in zip(u[ranking].tolist(), v[ranking].tolist()):
+            if degree[a] < 2 and degree[b] < 2:
+                ra, rb = find(a), find(b)
+                if ra != rb:
+                    parent[ra] = rb
+                    degree[a] += 1
+                    degree[b] += 1
+                    adj[a].append(b)
+                    adj[b].append(a)
+
+        # Unimos los caminos, partiendo de un extremo cualquiera
+        free = np.array([d < 2 for d in degree])
+        tree = self._free_index(free)
+        order = []
+        current = int(np.flatnonzero(free)[0])
+        while True:
+            # Recorremos el camino que empieza en current
+            self._take(current, free, tree)
+            prev = -1
+            while True:
+                order.append(current)
+                nxt = [c for c in adj[current] if c != prev]
+                if not nxt:
+                    break
+                prev, current = current, nxt[0]
+            self._take(current, free, tree)
+            # Saltamos al extremo libre mas cercano
+            if len(order) == n:
+                break
+            current = self._closest(current, free, tree)
+        return Tour(order).to_state()
+
+    def _free_index(self, free: np.ndarray) -> KDTree | None:
+        """Construye un KD-tree con las ciudades libres, si hay coordenadas."""
+        if self.coords is None:
+            return None
+        tree = KDTree(self.coords)
+        for c in np.flatnonzero(~free).tolist():
+            tree.remove(c)
+        return tree
+
+    @staticmethod
+    def _take(c: int, free: np.ndarray, tree: KDTree | None) -> None:
+        """Marca a la ciudad c como ocupada."""
+        free[c] = False
+        if tree is not None:
+            tree.remove(c)
+
+    def _closest(self, c: int, free: np.ndarray, tree: KDTree | None) -> int:
+        """Determina la ciudad libre mas cercana a c."""
+        if tree is not None:
+            _, idx = tree.query(self.coords[c], 1)
+            return idx.item(0)
+        left = np.flatnonzero(free)
+        return left[np.argmin(self.dist[c, left])].item()
+
+    def space_filling_tour(self) -> list[int]:
+        """Construye un tour siguiendo una curva de Hilbert.
+
+        Las coordenadas se escalan a una grilla de 2^16 x 2^16 y las ciudades
+        se visitan en el orden de su indice sobre la curva.
+
+        Retorno:
+        =======
+        state: list[int]
+            un estado
+        """
+        if self.coords is None:
+            raise ValueError("la curva de Hilbert requiere coordenadas")
+        side = (1 << HILBERT_ORDER) - 1
+        low = self.coords.min(axis=0)
+        span = max(float((self.coords.max(axis=0) - low).max()), 1e-12)
+        grid = ((self.coords - low) / span * side).astype(np.int64)
+        index = _hilbert_index(grid[:, 0], grid[:, 1], HILBERT_ORDER)
+        return Tour(np.argsort(index, kind='stable')).to_state()
+
+
+def _hilbert_index(x: np.ndarray, y: np.ndarray, order: int) -> np.ndarray:
+    """Calcula el indice de cada punto de la grilla sobre la curva de Hilbert.
+
+    Argumentos:
+    ==========
+    x, y: np.ndarray
+        coordenadas enteras entre 0 y 2^order - 1
+    order: int
+        orden de la curva
+
+    Retorno:
+    =======
+    index: np.ndarray
+        posicion de cada punto a lo largo de la curva
+    """
+    side = 1 << order
+    x, y = x.copy(), y.copy()
+    index = np.zeros(len(x), dtype=np.int64)
+    s = side >> 1
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        index += s * s * ((3 * rx) ^ ry)
+        # Rotamos el cuadrante para que la curva quede en la orientacion base
+        flip = ~ry & rx
+        x[flip] = side - 1 - x[flip]
+        y[flip] = side - 1 - y[flip]
+        swap = ~ry
+        x[swap], y[swap] = y[swap], x[swap]
+        s >>= 1
+    return index
+
+
+def _as_moves(moves: Moves) -> tuple[str, ...]:
+    """Normaliza una familia o una tupla de familias de movimientos."""
+    return (moves,) if isinstance(moves, str) else tuple(moves)
+
+
+def _or_opt_triples(n: int, seg: int) -> tuple[np.ndarray, ...]:
+    """Construye las acciones Or-opt de un tour de n ciudades.
+
+    Son los intercambios de tramos (i, j, k) en los que alguno de los dos
+    tramos tiene a lo sumo seg ciudades, es decir, reubicar un tramo corto
+    hacia adelante o hacia atras en el tour.
+    """
+    i, j, k = [], [], []
+    for length in range(1, seg + 1):
+        # primer tramo [i+1..j] corto, se reubica hacia adelante
+        for a in range(0, n - 1 - length):
+            b = a + length
+            k.append(np.arange(b + 1, n))
+            i.append(np.full(len(k[-1]), a))
+            j.append(np.full(len(k[-1]), b))
+        # segundo tramo [j+1..k] corto, se reubica hacia atras
+        for b in range(seg + 1, n - length):
+            i.append(np.arange(0, b - seg))
+            j.append(np.full(len(i[-1]), b))
+            k.append(np.full(len(i[-1]), b + length))
+    if not i:  # sin acciones, con a lo sumo 2 ciudades
+        return (np.empty(0, dtype=np.int64),) * 3
+    return np.concatenate(i), np.concatenate(j), np.concatenate(k)
+
+
+def _triple_keys(arrays: tuple[np.ndarray, ...], n: int) -> np.ndarray:
+    """Codifica cada terna (i, j, k) de n ciudades como un unico entero."""
+    i, j, k = (x.astype(np.int64) for x in arrays)
+    return (i * n + j) * n + k
+
+
+def _window_triples(n: int, window: int) -> tuple[np.ndarray, ...]:
+    """Construye las acciones 3-opt restringidas de un tour de n ciudades.
+
+    Son los intercambios de tramos (i, j, k) con k - i <= window, es decir,
+    los dos tramos intercambiados caben en una ventana de posiciones.
+    """
+    a, b = np.triu_indices(window + 1, k=1)
+    keep = a >= 1
+    a, b = a[keep], b[keep]
+    i = np.repeat(np.arange(n), len(a))
+    j = i + np.tile(a, n)
+    k = i + np.tile(b, n)
+    keep = k <= n - 1
+    return i[keep], j[keep], k[keep]
+
+
+def distance_matrix(G: Graph) -> np.ndarray:
+    """Construye la matriz densa de distancias de un grafo.
+
+    Las ciudades se indexan en el orden de los nodos: tsplib95 enumera los
+    nodos de 1 a n en las instancias con coordenadas, pero de 0 a n-1 en las
+    instancias EXPLICIT.
+
+    Argumentos:
+    ==========
+    G: Graph
+        grafo completo con pesos
+
+    Retorno:
+    =======
+    dist: np.ndarray
+        matriz de n x n, dist[i, j] es el peso de la arista entre el i-esimo
+        y el j-esimo nodo en orden creciente
+    """
+    index = {u: i for i, u in enumerate(sorted(G.nodes()))}
+    dist = np.zeros((len(index), len(index)), dtype=np.float64)
+    for u, v, w in G.edges(data='weight'):
+        dist[index[u], index[v]] = w
+        dist[index[v], index[u]] = w
+    return dist
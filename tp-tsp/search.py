@@ -13,34 +13,429 @@ No viene implementado, se debe completar.
 
 * Tabu: algoritmo de busqueda tabu.
 No viene implementado, se debe completar.
+
+* FirstImprovement: algoritmo de ascension de colinas de primera mejora,
+restringido a listas de vecinos cercanos y con bits de "no mirar".
+
+* SimulatedAnnealing: algoritmo de recocido simulado, que evalua una unica
+accion al azar por iteracion.
+
+* LinKernighan: algoritmo de mejora de profundidad variable al estilo
+Lin-Kernighan, iterado con perturbaciones de doble puente.
 """
 
 
 from __future__ import annotations
-from problem import OptProblem, TSP
-from random import choice
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import nlargest
+from math import exp, inf, log
+from operator import itemgetter
+from problem import OptProblem, TSP, State, Action, Moves, TWO_OPT
+from queue import Queue
+from random import choice, randrange
+from threading import Thread
 from time import time
+from tour import Tour
+from typing import Callable, Iterable, Iterator, NamedTuple
+import multiprocessing
+import random
+import numpy as np
+
+
+class Budget:
+    """Clase que representa el presupuesto de computo de una busqueda local.
+
+    Todos los limites son opcionales (None significa sin limite) y la
+    busqueda se detiene al alcanzar el primero de ellos:
+
+    * time_limit: tiempo de ejecucion, en segundos.
+    * max_iters: cantidad de iteraciones.
+    * max_evals: cantidad de diferencias de valor objetivo evaluadas.
+    * target: valor objetivo que se considera suficiente (recordar que el
+      valor objetivo del TSP es el opuesto de la distancia del tour).
+    * stall: cantidad de iteraciones seguidas sin mejorar el mejor valor.
+
+    Consultar el presupuesto cuesta O(1): solo compara contadores y lee
+    el reloj una vez.
+    """
+
+    def __init__(self, time_limit: float | None = None,
+                 max_iters: int | None = None, max_evals: int | None = None,
+                 target: float | None = None,
+                 stall: int | None = None) -> None:
+        """Construye un presupuesto."""
+        self.time_limit = time_limit
+        self.max_iters = max_iters
+        self.max_evals = max_evals
+        self.target = target
+        self.stall = stall
+        self.start_time = 0.0  # Instante en que empezo la busqueda
+        self.deadline = inf  # Instante en que se agota el tiempo
+
+    def start(self) -> None:
+        """Pone en marcha el reloj del presupuesto."""
+        self.start_time = time()
+        if self.time_limit is not None:
+            self.deadline = self.start_time + self.time_limit
+
+    def bounded(self) -> bool:
+        """Determina si el presupuesto limita el tiempo o el computo."""
+        return (self.time_limit, self.max_iters, self.max_evals) != (None,) * 3
+
+    def exhausted(self, niters: int, nevals: int, best: float,
+                  stalled: int) -> bool:
+        """Determina si se agoto el presupuesto.
+
+        Argumentos:
+        ==========
+        niters: int
+            iteraciones realizadas
+        nevals: int
+            diferencias de valor objetivo evaluadas
+        best: float
+            mejor valor objetivo encontrado
+        stalled: int
+            iteraciones desde la ultima mejora del mejor valor
+        """
+        return ((self.max_iters is not None and niters >= self.max_iters)
+                or (self.max_evals is not None and nevals >= self.max_evals)
+                or (self.target is not None and best >= self.target)
+                or (self.stall is not None and stalled >= self.stall)
+                or time() >= self.deadline)
+
+    def fraction(self, niters: int, nevals: int) -> float:
+        """Determina la fraccion consumida de los limites de computo."""
+        frac = 0.0
+        if self.time_limit is not None:
+            frac = (time() - self.start_time) / self.time_limit
+        if self.max_iters is not None:
+            frac = max(frac, niters / self.max_iters)
+        if self.max_evals is not None:
+            frac = max(frac, nevals / self.max_evals)
+        return frac
+
+    def steps_left(self, niters: int, nevals: int, stalled: int) -> float:
+        """Cota de las iteraciones que faltan para agotar algun contador.
+
+        Supone que cada iteracion evalua al menos una diferencia. Permite a
+        una busqueda consultar el presupuesto solo cada cierta cantidad de
+        iteraciones sin pasarse de los limites de iteraciones, evaluaciones
+        o estancamiento (inf si no hay ninguno).
+        """
+        left = inf
+        if self.max_iters is not None:
+            left = min(left, self.max_iters - niters)
+        if self.max_evals is not None:
+            left = min(left, self.max_evals - nevals)
+        if self.stall is not None:
+            left = min(left, self.stall - stalled)
+        return left
+
+    def remaining(self, niters: int, nevals: int) -> Budget:
+        """Devuelve el presupuesto que queda tras consumir parte de este.
+
+        Comparte el reloj de este presupuesto, y sus limites de iteraciones
+        y evaluaciones se reducen en lo ya consumido. Sirve para que una
+        busqueda auxiliar use solo lo que le queda a la busqueda principal.
+        """
+        budget = self.clock()
+        if self.max_iters is not None:
+            budget.max_iters = max(self.max_iters - niters, 0)
+        if self.max_evals is not None:
+            budget.max_evals = max(self.max_evals - nevals, 0)
+        budget.target = self.target
+        return budget
+
+    def clock(self) -> Budget:
+        """Devuelve un presupuesto que solo comparte el reloj de este.
+
+        Sirve para que una busqueda auxiliar respete el tiempo disponible de
+        la busqueda principal sin heredar sus demas limites.
+        """
+        budget = Budget(self.time_limit)
+        budget.start_time, budget.deadline = self.start_time, self.deadline
+        return budget
+
+
+class Progress(NamedTuple):
+    """Mejora del mejor estado encontrado durante una busqueda.
+
+    niters y nevals son los contadores de la busqueda y time el tiempo
+    transcurrido desde que empezo. tour es una copia del estado, o None si
+    la busqueda no guarda los estados.
+    """
+
+    niters: int
+    nevals: int
+    time: float
+    value: float
+    tour: State | None = None
+
 
 class LocalSearch:
-    """Clase que representa un algoritmo de busqueda local general."""
+    """Clase que representa un algoritmo de busqueda local general.
+
+    Mientras resuelve, cada vez que mejora el mejor valor objetivo agrega un
+    Progress a self.history y se lo pasa a self.callback, si no es None.
+    Si self.record_tours es True, cada Progress incluye una copia del estado.
+    self.progress permite ademas recorrer las mejoras con un generador a
+    medida que ocurren, y self.stop detener la busqueda desde otro hilo
+    conservando el mejor estado encontrado hasta ese momento.
+    """
 
-    def __init__(self) -> None:
-        """Construye una instancia de la clase."""
+    def __init__(self, reeval: int = 0, moves: Moves = TWO_OPT,
+                 budget: Budget | None = None,
+                 init: str | None = None) -> None:
+        """Construye una instancia de la clase.
+
+        Argumentos:
+        ==========
+        reeval: int
+            cada cuantas iteraciones recalcular el valor objetivo completo
+            para evitar la acumulacion de errores de redondeo
+            (0 para no recalcularlo nunca)
+        moves: str | tuple[str, ...]
+            familia o familias de movimientos del vecindario
+            (TWO_OPT, OR_OPT, THREE_OPT)
+        budget: Budget | None
+            presupuesto de computo (por defecto, sin limites)
+        init: str | None
+            tour inicial construido con problem.initial_tour (IDENTITY,
+            NEAREST_NEIGHBOR, GREEDY o SPACE_FILLING), por defecto el
+            estado inicial del problema
+        """
         self.niters = 0  # Numero de iteraciones totales
+        self.nevals = 0  # Numero de diferencias de valor objetivo evaluadas
         self.time = 0  # Tiempo de ejecucion
         self.tour = []  # Solucion, inicialmente vacia
         self.value = None  # Valor objetivo de la solucion
+        self.reeval = reeval  # Periodo de reevaluacion del valor objetivo
+        self.moves = moves  # Familias de movimientos del vecindario
+        self.budget = budget or Budget()  # Presupuesto de computo
+        self.init = init  # Tour inicial, ver initial_state
+        self.history = []  # Mejoras del mejor valor, como Progress
+        self.callback = None  # Funcion que recibe cada Progress
+        self.record_tours = False  # Si cada Progress guarda el estado
+        self._best = -inf  # Mejor valor visto por exhausted
+        self._best_iter = 0  # Iteracion en que se vio el mejor valor
+        self._stopped = False  # Si se pidio detener la busqueda
+        # Evento compartido con otro proceso que, al activarse, detiene la
+        # busqueda igual que stop (por ejemplo, un multiprocessing.Event)
+        self.stop_event = None
 
     def solve(self, problem: OptProblem):
         """Resuelve un problema de optimizacion."""
         self.tour = problem.init
         self.value = problem.obj_val(problem.init)
 
+    def initial_state(self, problem: OptProblem) -> State:
+        """Devuelve el estado desde el que parte la busqueda."""
+        if self.init is None:
+            return problem.init
+        return problem.initial_tour(self.init)
+
+    def start(self) -> None:
+        """Pone en marcha el presupuesto al comenzar a resolver."""
+        self.budget.start()
+        self._best, self._best_iter = -inf, self.niters
+        self.history, self._stopped = [], False
+
+    def stop(self) -> None:
+        """Pide detener la busqueda en la proxima consulta del presupuesto."""
+        self._stopped = True
+
+    def exhausted(self, value: float, state=None) -> bool:
+        """Determina si se agoto el presupuesto de la busqueda.
+
+        Si value mejora al mejor valor visto, registra la mejora.
+
+        Argumentos:
+        ==========
+        value: float
+            valor objetivo del estado actual, para detectar estancamiento
+        state: State | Tour | None
+            estado actual, que se copia en el registro si record_tours
+
+        Retorno:
+        =======
+        exhausted: bool
+            si la busqueda debe detenerse
+        """
+        self.improved(value, state)
+        if self._stopped or (self.stop_event is not None
+                             and self.stop_event.is_set()):
+            return True
+        return self.budget.exhausted(
+            self.niters, self.nevals, self._best,
+            self.niters - self._best_iter)
+
+    def improved(self, value: float, state=None) -> bool:
+        """Registra value si mejora al mejor valor visto.
+
+        Lo usan exhausted y las busquedas que no consultan el presupuesto en
+        cada iteracion, para no perder mejoras ni medir mal el
+        estancamiento. Devuelve si hubo mejora.
+        """
+        if value > self._best:
+            self._best, self._best_iter = value, self.niters
+            self._report(value, state)
+            return True
+        return False
+
+    def _report(self, value: float, state) -> None:
+        """Registra una mejora del mejor valor objetivo."""
+        tour = None
+        if self.record_tours and state is not None:
+            tour = state.to_state() if isinstance(state, Tour) else list(state)
+        self._emit(Progress(self.niters, self.nevals,
+                            time() - self.budget.start_time, value, tour))
+
+    def _emit(self, event: Progress) -> None:
+        """Agrega una mejora al historial y se la pasa a self.callback."""
+        self.history.append(event)
+        if self.callback is not None:
+            self.callback(event)
+
+    def progress(self, problem: OptProblem) -> Iterator[Progress]:
+        """Resuelve un problema y genera las mejoras a medida que ocurren.
+
+        La busqueda corre en otro hilo. Si se deja de recorrer el generador
+        antes de que termine, la busqueda se detiene y conserva el mejor
+        estado encontrado.
+
+        Argumentos:
+        ==========
+        problem: OptProblem
+            un problema de optimizacion
+
+        Retorno:
+        =======
+        progress: Iterator[Progress]
+            las mejoras del mejor valor objetivo
+        """
+        events, callback, done = Queue(), self.callback, object()
+        errors = []
+
+        def forward(event: Progress) -> None:
+            events.put(event)
+            if callback is not None:
+                callback(event)
+
+        def run() -> None:
+            try:
+                self.solve(problem)
+            except BaseException as error:
+                errors.append(error)
+            finally:
+                events.put(done)
+
+        self.callback = forward
+        thread = Thread(target=run, daemon=True)
+        thread.start()
+        try:
+            while (event := events.get()) is not done:
+                yield event
+        finally:
+            self.stop()
+            thread.join()
+            self.callback = callback
+        if errors:
+            raise errors[0]
+
+    def update_value(self, problem: OptProblem, state, value: float,
+                     delta: float) -> float:
+        """Actualiza de forma incremental el valor objetivo tras un movimiento.
+
+        Suma al valor anterior la diferencia devuelta por val_diff, y cada
+        self.reeval iteraciones lo recalcula desde cero con obj_val.
+
+        Argumentos:
+        ==========
+        problem: OptProblem
+            un problema de optimizacion
+        state: State
+            estado alcanzado tras el movimiento
+        value: float
+            valor objetivo del estado anterior
+        delta: float
+            diferencia de valor objetivo del movimiento aplicado
+
+        Retorno:
+        =======
+        value: float
+            valor objetivo de state
+        """
+        if self.reeval and self.niters % self.reeval == 0:
+            return problem.obj_val(state)
+        return value + delta
+
+    def best_move(self, problem: OptProblem, diff: dict | np.ndarray,
+                  rng: random.Random | None = None) -> tuple[Action, float]:
+        """Elige una accion de maxima diferencia de valor objetivo.
+
+        Los empates se resuelven de forma aleatoria. La seleccion es lineal
+        en el tamaño del vecindario: el maximo se calcula una unica vez.
+
+        Argumentos:
+        ==========
+        problem: OptProblem
+            un problema de optimizacion
+        diff: dict[Action, float] | np.ndarray
+            diferencias devueltas por problem.val_diff(state)
+            o por problem.val_diff_array(state)
+        rng: random.Random | None
+            generador para los desempates (por defecto, el del modulo
+            random)
+
+        Retorno:
+        =======
+        act: Action
+            accion elegida
+        best: float
+            diferencia de valor objetivo de la accion elegida
+        """
+        pick = choice if rng is None else rng.choice
+        if isinstance(diff, dict):
+            best = max(diff.values())
+            return pick([a for a, v in diff.items() if v == best]), best
+        best = diff.max()
+        k = pick(np.flatnonzero(diff == best).tolist())
+        return problem.action(k, self.moves), float(best)
+
+    def top_moves(self, problem: OptProblem, diff: dict | np.ndarray,
+                  k: int) -> list[tuple[Action, float]]:
+        """Elige las k acciones de mayor diferencia de valor objetivo.
+
+        Argumentos:
+        ==========
+        problem: OptProblem
+            un problema de optimizacion
+        diff: dict[Action, float] | np.ndarray
+            diferencias devueltas por problem.val_diff(state)
+            o por problem.val_diff_array(state)
+        k: int
+            cantidad de acciones a elegir
+
+        Retorno:
+        =======
+        moves: list[tuple[Action, float]]
+            acciones elegidas y sus diferencias, de mayor a menor
+        """
+        if isinstance(diff, dict):
+            return nlargest(k, diff.items(), key=itemgetter(1))
+        k = min(k, len(diff))
+        top = np.argpartition(-diff, k - 1)[:k]
+        top = top[np.argsort(-diff[top], kind="stable")]
+        return [(problem.action(t, self.moves), float(diff[t]))
+                for t in top.tolist()]
+
 class HillClimbing(LocalSearch):
     """Clase que representa un algoritmo de ascension de colinas.
 
     En cada iteracion se mueve al estado sucesor con mejor valor objetivo.
-    El criterio de parada es alcanzar un optimo local.
+    El criterio de parada es alcanzar un optimo local o agotar el
+    presupuesto.
     """
 
     def solve(self, problem: OptProblem):
@@ -53,160 +448,459 @@ class HillClimbing(LocalSearch):
         """
         # Inicio del reloj para medir el tiempo de ejecución del algoritmo
         start = time()
+        self.start()
 
         # Arrancamos desde el estado inicial definido en el problema
-        actual = problem.init
-        # Evaluamos el valor objetivo del estado inicial
-        value = problem.obj_val(problem.init)
+        # y ascendemos hasta alcanzar un óptimo local
+        init = self.initial_state(problem)
+        self.tour, self.value = self.climb(problem, init,
+                                           problem.obj_val(init))
 
-        while True:
+        # Medimos el tiempo total de ejecución
+        end = time()
+        self.time = end - start
+
+    def climb(self, problem: OptProblem, actual: State, value: float,
+              rng: random.Random | None = None) -> tuple[State, float]:
+        """Asciende desde un estado hasta alcanzar un optimo local.
+
+        Los movimientos se aplican en el lugar sobre una copia del estado de
+        partida, sin generar un estado nuevo en cada iteracion. Si se agota
+        el presupuesto, se detiene antes de alcanzar el optimo local.
+
+        Argumentos:
+        ==========
+        problem: OptProblem
+            un problema de optimizacion
+        actual: State
+            estado de partida
+        value: float
+            valor objetivo del estado de partida
+        rng: random.Random | None
+            generador para los desempates, ver best_move
+
+        Retorno:
+        =======
+        actual: State
+            optimo local alcanzado
+        value: float
+            valor objetivo del optimo local
+        """
+        actual = list(actual)  # copiamos una única vez el estado de partida
+
+        while not self.exhausted(value, actual):
             # Determinamos las acciones posibles desde el estado actual
             # y calculamos las diferencias en valor objetivo que resultan de aplicar cada acción
-            diff = problem.val_diff(actual)
-
-            # Identificamos las acciones que generan el mayor incremento en el valor objetivo
-            max_acts = [act for act, val in diff.items() if val == max(diff.values())]
+            diff = problem.val_diff_array(actual, self.moves)
+            self.nevals += diff.size
 
-            # Elegimos aleatoriamente una de las mejores acciones
-            act = choice(max_acts)
+            # Elegimos aleatoriamente una de las acciones que generan
+            # el mayor incremento en el valor objetivo
+            act, best = self.best_move(problem, diff, rng)
 
             # Si la diferencia de valor objetivo para la mejor acción no es positiva
             # significa que hemos alcanzado un óptimo local
-            if diff[act] <= 0:
-                # Guardamos el estado y el valor objetivo final
-                self.tour = actual
-                self.value = value
-                # Medimos el tiempo total de ejecución
-                end = time()
-                self.time = end - start
-                # Terminamos la ejecución del algoritmo
-                return
+            if best <= 0:
+                return actual, value
 
             # Si no estamos en un óptimo local, nos movemos al estado sucesor
-            else:
-                # Actualizamos el estado actual aplicando la acción elegida
-                actual = problem.result(actual, act)
-                # Actualizamos el valor objetivo sumando la diferencia producida por la acción
-                value = value + diff[act]
-                # Incrementamos el contador de iteraciones
-                self.niters += 1
+            # Actualizamos el estado actual aplicando en el lugar la acción elegida
+            problem.apply(actual, act)
+            # Incrementamos el contador de iteraciones
+            self.niters += 1
+            # Actualizamos el valor objetivo sumando la diferencia producida por la acción
+            value = self.update_value(problem, actual, value, best)
+
+        return actual, value
 
 
 class HillClimbingReset(LocalSearch):
-    """Algoritmo de ascension de colinas con reinicio aleatorio."""
+    """Algoritmo de ascension de colinas con reinicio aleatorio.
+
+    Asciende restarts veces hasta un optimo local, la primera desde el
+    estado inicial del problema y las demas desde un estado aleatorio, y
+    se queda con el mejor optimo local. El valor de cada optimo se obtiene
+    del propio ascenso, sin volver a evaluar los tours.
+
+    Con workers > 1 los reinicios se reparten entre un pool de procesos.
+    Cada proceso recibe la instancia una unica vez al iniciarse, con la
+    matriz de distancias en memoria compartida (ver TSP.shared), y cada
+    reinicio r usa la semilla seed + r, de modo que el resultado no depende
+    de la cantidad de procesos ni del orden en que terminan.
+
+    Al terminar, self.runs tiene un resumen de cada reinicio: un diccionario
+    con el valor del optimo local ("value"), las iteraciones del ascenso
+    ("niters"), las diferencias evaluadas ("nevals") y su tiempo de
+    ejecucion ("time").
+
+    El presupuesto se revisa entre reinicios. Dentro de cada ascenso se
+    revisa su limite de tiempo y, con workers = 1, tambien lo que queda de
+    sus limites de iteraciones, evaluaciones y valor objetivo.
+
+    stop detiene tambien los ascensos en curso. Con workers = 1 las mejoras
+    de cada ascenso se registran (y se informan a callback) a medida que
+    ocurren; con workers > 1, al terminar cada reinicio.
+    """
+
+    def __init__(self, restarts: int = 100, workers: int = 1,
+                 seed: int | None = None, reeval: int = 0,
+                 moves: Moves = TWO_OPT, budget: Budget | None = None,
+                 init: str | None = None) -> None:
+        """Construye una instancia de la clase.
+
+        Argumentos:
+        ==========
+        restarts: int
+            cantidad de reinicios aleatorios
+        workers: int
+            cantidad de procesos (1 para resolver en el proceso actual)
+        seed: int | None
+            semilla de los reinicios (por defecto, al azar)
+        reeval: int
+            ver LocalSearch
+        moves: str | tuple[str, ...]
+            ver LocalSearch
+        budget: Budget | None
+            ver LocalSearch
+        init: str | None
+            tour inicial del primer reinicio, ver LocalSearch
+        """
+        super().__init__(reeval, moves, budget, init)
+        self.restarts = restarts
+        self.workers = workers
+        self.seed = seed
+        self.runs = []  # Resumen de cada reinicio
+        self._climber = None  # Ascenso en curso, con workers = 1
+        self._cancel = None  # Evento que detiene los ascensos del pool
+
+    def stop(self) -> None:
+        """Pide detener la busqueda, incluido el ascenso en curso.
+
+        Con workers > 1 los ascensos que estan corriendo en el pool se
+        detienen en su proxima iteracion, y los pendientes se cancelan.
+        """
+        super().stop()
+        if self._climber is not None:
+            self._climber.stop()
+        if self._cancel is not None:
+            self._cancel.set()
 
     def solve(self, problem: TSP) -> None:
-        start: int = time()
+        """Resuelve un TSP con ascension de colinas con reinicio aleatorio.
+
+        Argumentos:
+        ==========
+        problem: TSP
+            una instancia del TSP
+        """
+        # Inicio del reloj para medir el tiempo de ejecución del algoritmo
+        start = time()
 
-        cnt: int = 0
-        iterations: int = 100
+        # Descartamos los resultados de una resolucion anterior, que
+        # _collect compararia con los de esta instancia
+        self.tour, self.value, self.runs = [], None, []
+        self.niters = self.nevals = 0
+        self.start()
 
-        # Arrancamos del estado inicial
-        actual: list[int] = problem.init
-        value: float = problem.obj_val(problem.init)
+        # Semillas de cada reinicio
+        seed = self.seed if self.seed is not None else randrange(2**32)
+        seeds = [seed + r for r in range(self.restarts)]
+        # El primer reinicio parte del tour inicial y los demas, al azar
+        inits = [self.initial_state(problem)] + [None] * (self.restarts - 1)
+
+        climber = HillClimbing(self.reeval, self.moves, self.budget.clock())
+        if self.workers > 1:
+            # Repartimos los reinicios entre los procesos del pool, que
+            # comparten una unica copia de la matriz de distancias
+            self._cancel = multiprocessing.Event()
+            if self._stopped:
+                self._cancel.set()
+            with problem.shared(), ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_init_restart_worker,
+                    initargs=(problem, climber, self._cancel)) as pool:
+                self._collect(pool.map(_run_restart, seeds, inits))
+                # Detenemos los ascensos que siguen corriendo
+                self._cancel.set()
+                pool.shutdown(cancel_futures=True)
+            self._cancel = None
+        else:
+            # Ejecutamos los reinicios uno tras otro en este proceso; las
+            # mejoras de cada ascenso se registran como mejoras de la
+            # busqueda a medida que ocurren
+            climber.callback = self._forward
+            climber.record_tours = self.record_tours
+            self._climber = climber
+            if self._stopped:
+                climber.stop()
+            self._collect(self._restarts(problem, climber, seeds, inits))
+            self._climber = None
+
+        # Medimos el tiempo total de ejecución
+        end = time()
+        self.time = end - start
+
+    def _restarts(self, problem: TSP, climber: HillClimbing,
+                  seeds: list[int], inits: list[list[int] | None]
+                  ) -> Iterator[tuple]:
+        """Ejecuta los reinicios en este proceso, uno tras otro.
+
+        Cada ascenso recibe lo que queda del presupuesto, de modo que los
+        limites de iteraciones, evaluaciones y valor objetivo se respetan
+        tambien dentro de cada reinicio.
+        """
+        for seed, init in zip(seeds, inits):
+            climber.budget = self.budget.remaining(self.niters, self.nevals)
+            yield _restart(problem, climber, seed, init)
+
+    def _forward(self, event: Progress) -> None:
+        """Registra una mejora del ascenso en curso como mejora propia.
+
+        Los contadores del evento son los del ascenso, a los que se suman
+        los de los reinicios anteriores.
+        """
+        if event.value <= self._best:
+            return
+        self._best, self._best_iter = event.value, self.niters + event.niters
+        self._emit(event._replace(niters=self._best_iter,
+                                  nevals=self.nevals + event.nevals,
+                                  time=time() - self.budget.start_time))
+
+    def _collect(self, results: Iterable[tuple]) -> None:
+        """Registra los reinicios y mantiene el mejor optimo local.
+
+        Deja de consumir reinicios cuando se agota el presupuesto.
+        """
+        for tour, value, niters, nevals, elapsed in results:
+            self.niters += niters
+            self.nevals += nevals
+            self.runs.append({"value": value, "niters": niters,
+                              "nevals": nevals, "time": elapsed})
+            if self.value is None or value > self.value:
+                self.tour, self.value = tour, value
+            if self.exhausted(self.value, self.tour):
+                return
+
+
+# Estado de cada proceso del pool de HillClimbingReset
+_worker_problem: TSP | None = None
+_worker_climber: HillClimbing | None = None
+
+
+def _init_restart_worker(problem: TSP, climber: HillClimbing,
+                         cancel) -> None:
+    """Guarda la instancia y el algoritmo en el proceso del pool.
+
+    cancel es el evento de HillClimbingReset que detiene los ascensos.
+    """
+    global _worker_problem, _worker_climber
+    _worker_problem = problem
+    _worker_climber = climber
+    climber.stop_event = cancel
+
+
+def _run_restart(seed: int, init: list[int] | None) -> tuple:
+    """Ejecuta un reinicio de HillClimbingReset en un proceso del pool."""
+    return _restart(_worker_problem, _worker_climber, seed, init)
 
-        while True:
-            # Determinar las acciones que se pueden aplicar
-            # y las diferencias en valor objetivo que resultan
-            diff: dict[tuple[int, int], float] = problem.val_diff(actual)
-
-            # Buscar las acciones que generan el mayor incremento de valor obj
-            max_acts: list[tuple[int, int]] = [act for act, val in diff.items() if val ==
-                        max(diff.values())]
-
-            # Elegir una acción aleatoria entre las que generan el mayor incremento en el valor objetivo
-            act: tuple[int, int] = choice(max_acts)
-
-            # Lista para almacenar todos los estados generados durante el reinicio
-            all_states_results: list[list[int]] = [actual]
-
-            # Retornar si estamos en un óptimo local (diferencia de valor objetivo no positiva)
-            if diff[act] <= 0:
-                # Reiniciamos aleatoriamente el estado y agregamos el nuevo estado a la lista de resultados
-                actual = problem.random_reset()
-                all_states_results.append(actual)
-                
-                # Incrementamos el contador de reinicios
-                cnt += 1
-                
-                # Si alcanzamos el número máximo de reinicios, seleccionamos el mejor estado encontrado
-                if cnt == iterations:
-                    # Evaluamos el valor objetivo de todos los estados generados durante el reinicio
-                    values: list[float] = [problem.obj_val(state) for state in all_states_results]
-                    # Seleccionamos el estado con el mayor valor objetivo
-                    final_val: int = max(values)
-                    final_state: list[int] = all_states_results[values.index(final_val)]
-
-                    # Registro del tiempo y resultados finales
-                    end = time()
-                    self.time = end - start
-                    self.tour = final_state
-                    self.value = final_val
-
-                    # Terminamos la ejecución del algoritmo
-                    return 
-            else:
-                # Si no estamos en un óptimo local, nos movemos al estado sucesor
-                actual = problem.result(actual, act)
-                # Actualizamos el valor objetivo sumando la diferencia producida por la acción
-                value = value + diff[act]
-                # Incrementamos el contador de iteraciones
-                self.niters += 1
+
+def _restart(problem: TSP, climber: HillClimbing, seed: int,
+             init: list[int] | None
+             ) -> tuple[list[int], float, int, int, float]:
+    """Ejecuta un reinicio de HillClimbingReset.
+
+    Argumentos:
+    ==========
+    problem: TSP
+        una instancia del TSP
+    climber: HillClimbing
+        algoritmo con el que se asciende
+    seed: int
+        semilla del estado aleatorio y de los desempates
+    init: list[int] | None
+        estado de partida, o None para partir de uno aleatorio
+
+    Retorno:
+    =======
+    tour: list[int]
+        optimo local alcanzado
+    value: float
+        valor objetivo del optimo local
+    niters: int
+        cantidad de iteraciones del ascenso
+    nevals: int
+        cantidad de diferencias de valor objetivo evaluadas
+    time: float
+        tiempo de ejecucion del reinicio
+    """
+    start = time()
+    # Generadores propios para el estado aleatorio y para los desempates,
+    # sin modificar el estado global del modulo random
+    if init is not None:
+        state = init
+    else:
+        state = problem.random_reset(random.Random(seed))
+    climber.niters = climber.nevals = 0
+    tour, value = climber.climb(problem, state, problem.obj_val(state),
+                                random.Random(seed))
+    return tour, value, climber.niters, climber.nevals, time() - start
+
+
+class TabuMemory:
+    """Memoria de corto plazo de la busqueda tabu.
+
+    Guarda para cada accion la iteracion hasta la cual es tabu, de modo que
+    consultar y actualizar el estado tabu de una accion cuesta O(1), y
+    obtener la mascara de todas las acciones tabu es una unica operacion
+    vectorizada.
+    """
+
+    def __init__(self, nactions: int, tenure: int) -> None:
+        """Construye una memoria tabu vacia.
+
+        Argumentos:
+        ==========
+        nactions: int
+            cantidad de acciones del problema
+        tenure: int
+            cantidad de iteraciones que una accion permanece tabu
+        """
+        self.tenure = tenure
+        self.expiry = np.zeros(nactions, dtype=np.int64)
+
+    def add(self, k: int, niters: int) -> None:
+        """Marca como tabu a la accion k a partir de la iteracion niters."""
+        self.expiry[k] = niters + self.tenure
+
+    def is_tabu(self, k: int, niters: int) -> bool:
+        """Determina si la accion k es tabu en la iteracion niters."""
+        return self.expiry[k] > niters
+
+    def mask(self, niters: int) -> np.ndarray:
+        """Devuelve una mascara con las acciones tabu en la iteracion niters."""
+        return self.expiry > niters
+
+    def oldest(self) -> np.ndarray:
+        """Devuelve una mascara con las acciones que dejan de ser tabu antes."""
+        return self.expiry == self.expiry.min()
 
 
 class Tabu(LocalSearch):
-    """Algoritmo de busqueda tabu."""
+    """Algoritmo de busqueda tabu.
+
+    En cada iteracion se mueve al mejor sucesor cuya accion no sea tabu,
+    aunque empeore el valor objetivo. Una accion aplicada queda tabu durante
+    tenure iteraciones, al igual que la accion que la deshace. Por el
+    criterio de aspiracion, una accion tabu se permite igual si lleva a un
+    estado mejor que el mejor encontrado. Si todas las acciones son tabu, se
+    permiten las que dejan de serlo antes.
+
+    El criterio de parada es agotar el presupuesto, por defecto 1000
+    iteraciones.
+    """
+
+    def __init__(self, tenure: int | None = None, aspiration: bool = True,
+                 reeval: int = 0, moves: Moves = TWO_OPT,
+                 budget: Budget | None = None,
+                 init: str | None = None) -> None:
+        """Construye una instancia de la clase.
+
+        Argumentos:
+        ==========
+        tenure: int | None
+            cantidad de iteraciones que una accion permanece tabu,
+            por defecto la mitad de la cantidad de ciudades
+        aspiration: bool
+            si se permiten las acciones tabu que mejoran al mejor estado
+        reeval: int
+            ver LocalSearch
+        moves: str | tuple[str, ...]
+            ver LocalSearch
+        budget: Budget | None
+            presupuesto de computo, que debe limitar el tiempo, las
+            iteraciones, las evaluaciones o el estancamiento
+        init: str | None
+            ver LocalSearch
+        """
+        super().__init__(reeval, moves, budget or Budget(max_iters=1000),
+                         init)
+        if not (self.budget.bounded() or self.budget.stall is not None):
+            raise ValueError("Tabu necesita un presupuesto acotado")
+        self.tenure = tenure
+        self.aspiration = aspiration
 
     def solve(self, problem: TSP) -> None:
         # Inicio del reloj para medir el tiempo de ejecución del algoritmo
         start: int = time()
+        self.start()
 
-        iterations: int = 1000
+        # Arrancamos del estado inicial, del que hacemos una única copia
+        # sobre la que se aplican en el lugar todos los movimientos
+        actual: list[int] = list(self.initial_state(problem))
+        value: float = problem.obj_val(actual)
+        value_mejor: float = value
 
-        # Arrancamos del estado inicial
-        actual: list[int] = problem.init
-        state_mejor: list[int] = actual
-        value_mejor: float = problem.obj_val(problem.init)
-        lista_tabu: list[int] = []
+        # Acciones aplicadas desde que se encontró el mejor estado, que se
+        # deshacen al final para recuperarlo sin haberlo copiado
+        desde_mejor: list[tuple[int, ...]] = []
 
-        while self.niters < iterations:
+        # La permanencia tabu escala con el tamaño de la instancia
+        tenure: int = self.tenure or max(problem.n // 2, 5)
+        tabu = TabuMemory(problem.nactions(self.moves), tenure)
+
+        while not self.exhausted(value, actual):
             # Calculamos las diferencias en valor objetivo que resultan de aplicar cada acción
-            diff: dict[tuple[int, int], float] = problem.val_diff(actual)
+            diff: np.ndarray = problem.val_diff_array(actual, self.moves)
+            self.nevals += diff.size
 
-            # Filtramos las acciones que no están en la lista tabú
-            no_tabues: dict = {}
+            # Sin acciones (a lo sumo 3 ciudades) no hay a donde moverse
+            if diff.size == 0:
+                break
 
-            for i, j in diff.items():
-                if i not in lista_tabu:
-                    no_tabues[i] = j
+            # Descartamos las acciones tabu, salvo las que cumplen
+            # el criterio de aspiracion
+            prohibidas: np.ndarray = tabu.mask(self.niters)
+            if self.aspiration:
+                prohibidas &= value + diff <= value_mejor
 
-            # Buscamos las acciones que generan el mayor incremento de valor objetivo
-            max_acts: list[int] = [act for act, val in no_tabues.items() if val ==
-                        max(no_tabues.values())]
+            # En instancias muy chicas todas las acciones pueden ser tabu a
+            # la vez: entonces permitimos las que dejan de serlo antes
+            if prohibidas.all():
+                prohibidas = ~tabu.oldest()
+            diff[prohibidas] = -np.inf
 
-            # Elegimos aleatoriamente una de las mejores acciones
-            act: int = choice(max_acts)
+            # Elegimos aleatoriamente una de las acciones que generan
+            # el mayor incremento de valor objetivo
+            act, best = self.best_move(problem, diff)
+
+            # Nos movemos al estado sucesor aplicando en el lugar la acción seleccionada
+            problem.apply(actual, act)
+            desde_mejor.append(act)
 
-            # Nos movemos al estado sucesor aplicando la acción seleccionada
-            actual: list[int] = problem.result(actual, act)
-            value: float = problem.obj_val(actual)
-            
-            # Actualizamos la lista tabú con la nueva acción
-            if len(lista_tabu) > 40:
-                lista_tabu.pop(0)
-            
-            lista_tabu.append(act)
-            
             # Incrementamos el contador de iteraciones
             self.niters += 1
+
+            # Marcamos como tabu a la acción aplicada y a la que la deshace,
+            # que en los intercambios de tramos es otra acción
+            tabu.add(problem.action_index(act, self.moves), self.niters)
+            tabu.add(problem.action_index(problem.inverse(act), self.moves),
+                     self.niters)
+
+            # Actualizamos el valor objetivo con la diferencia de la acción,
+            # sin recorrer todo el tour
+            value = self.update_value(problem, actual, value, best)
             
             # Actualizamos el mejor estado y valor objetivo si encontramos una solución mejor
             if value_mejor < value:
-                state_mejor = actual
                 value_mejor = value
-            
+                desde_mejor.clear()
+
+        # Volvemos al mejor estado deshaciendo las acciones posteriores
+        for act in reversed(desde_mejor):
+            problem.undo(actual, act)
+
         # Guardamos el mejor estado y valor objetivo encontrado
-        self.tour = state_mejor
+        self.tour = actual
         self.value = value_mejor
         
         # Registro del tiempo de ejecución
@@ -214,4 +908,509 @@ class Tabu(LocalSearch):
         self.time = end - start
         
         # Retornamos el mejor estado encontrado
-        return state_mejor
+        return actual
+
+
+class FirstImprovement(LocalSearch):
+    """Algoritmo de ascension de colinas de primera mejora para el TSP.
+
+    En lugar de evaluar todo el vecindario 2-opt, para cada ciudad a solo
+    considera reemplazar una de sus aristas del tour por una arista hacia
+    alguna de sus k ciudades mas cercanas, y aplica el primer movimiento
+    que mejora el valor objetivo.
+
+    Usa bits de "no mirar": una ciudad solo se vuelve a revisar cuando
+    cambia alguna de sus aristas del tour. El criterio de parada es que
+    ninguna ciudad tenga movimientos de mejora, es decir, un optimo local
+    respecto del vecindario restringido, o agotar el presupuesto.
+    """
+
+    def __init__(self, k: int = 8, reeval: int = 0,
+                 budget: Budget | None = None,
+                 init: str | None = None) -> None:
+        """Construye una instancia de la clase.
+
+        Argumentos:
+        ==========
+        k: int
+            cantidad de vecinos cercanos considerados por ciudad
+        reeval: int
+            ver LocalSearch
+        budget: Budget | None
+            ver LocalSearch
+        init: str | None
+            ver LocalSearch
+        """
+        super().__init__(reeval, budget=budget, init=init)
+        self.k = k
+
+    def solve(self, problem: TSP) -> None:
+        """Resuelve un TSP con ascension de colinas de primera mejora.
+
+        Argumentos:
+        ==========
+        problem: TSP
+            una instancia del TSP
+        """
+        # Inicio del reloj para medir el tiempo de ejecución del algoritmo
+        start = time()
+        self.start()
+
+        n = problem.n
+        dist = problem.dist
+        neigh = problem.neighbors(self.k).tolist()
+
+        # Arrancamos desde el estado inicial, con un tour que guarda
+        # la posición de cada ciudad para encontrarla en O(1)
+        init = self.initial_state(problem)
+        tour = Tour.from_state(init)
+        value = problem.obj_val(init)
+
+        # Cola de ciudades a revisar (las que tienen el bit de no mirar apagado)
+        queue = deque(range(n))
+        active = [True] * n
+
+        while not self.exhausted(value, tour) and queue:
+            a = queue.popleft()
+            active[a] = False
+
+            # Probamos reemplazar la arista hacia el sucesor y luego
+            # la arista hacia el predecesor de a
+            for forward in (True, False):
+                move = self._improving_move(tour, dist, neigh[a], a, forward)
+                if move is not None:
+                    break
+            else:
+                continue
+
+            # Aplicamos el movimiento invirtiendo el lado más corto del tour
+            delta, touched = move
+            tour.two_opt_move(*touched)
+
+            # Las ciudades cuyas aristas cambiaron vuelven a revisarse
+            for c in touched:
+                if not active[c]:
+                    active[c] = True
+                    queue.append(c)
+
+            self.niters += 1
+            value = self.update_value(problem, tour, value, delta)
+
+        self.tour = tour.to_state()
+        self.value = value
+        end = time()
+        self.time = end - start
+
+    def _improving_move(self, tour: Tour, dist: np.ndarray, cands: list[int],
+                        a: int, forward: bool) -> tuple[float, tuple] | None:
+        """Busca un movimiento 2-opt de mejora que agregue la arista (a, c).
+
+        Si forward es True se reemplazan las aristas (a, succ(a)) y
+        (c, succ(c)), y si no (pred(a), a) y (pred(c), c). En ambos casos
+        las nuevas aristas son (a, c) y (b, d).
+
+        Retorno:
+        =======
+        move: tuple[float, tuple] | None
+            la diferencia de valor objetivo y las ciudades (a, b, c, d),
+            o None si no hay movimientos de mejora
+        """
+        w = dist.item  # acceso escalar sin crear escalares de NumPy
+        neighbor = tour.succ if forward else tour.pred
+        b = neighbor(a)
+        dab = w(a, b)
+        for evals, c in enumerate(cands, 1):
+            g1 = dab - w(a, c)
+            if g1 <= 0:
+                # Los candidatos estan ordenados por distancia,
+                # ninguno de los siguientes puede mejorar
+                break
+            d = neighbor(c)
+            delta = g1 + w(c, d) - w(b, d)
+            if delta > 1e-9:
+                self.nevals += evals
+                return float(delta), (a, b, c, d)
+        else:
+            evals = len(cands)
+        self.nevals += evals
+        return None
+
+
+# Estimacion de la temperatura inicial del recocido simulado
+SA_CANDIDATES = 8  # vecinos cercanos de cada ciudad considerados
+SA_SAMPLES = 200  # movimientos sorteados
+SA_ACCEPTANCE = 0.1  # probabilidad de aceptar un empeoramiento medio
+
+
+def geometric_cooling(t0: float, t_end: float) -> Callable[[float], float]:
+    """Esquema de enfriamiento geometrico.
+
+    La temperatura baja de t0 a t_end multiplicandose por un factor
+    constante a medida que se consume el presupuesto.
+    """
+    return lambda frac: t0 * (t_end / t0) ** frac
+
+
+def linear_cooling(t0: float, t_end: float) -> Callable[[float], float]:
+    """Esquema de enfriamiento lineal de t0 a t_end."""
+    return lambda frac: t0 + (t_end - t0) * frac
+
+
+class SimulatedAnnealing(LocalSearch):
+    """Algoritmo de recocido simulado.
+
+    En cada iteracion sortea una unica accion y evalua solo su diferencia
+    de valor objetivo con problem.delta, en O(1). Si la accion mejora se
+    aplica, y si empeora se aplica con probabilidad exp(delta / T), donde T
+    es la temperatura. La temperatura baja segun un esquema de enfriamiento,
+    que es una funcion de la fraccion del presupuesto consumida (entre 0 y 1)
+    en la temperatura, como geometric_cooling o linear_cooling.
+
+    El criterio de parada es agotar el presupuesto, por defecto un segundo.
+    """
+
+    def __init__(self, schedule: Callable[[float], float] | None = None,
+                 reeval: int = 0, moves: Moves = TWO_OPT,
+                 budget: Budget | None = None,
+                 init: str | None = None) -> None:
+        """Construye una instancia de la clase.
+
+        Argumentos:
+        ==========
+        schedule: Callable[[float], float] | None
+            esquema de enfriamiento, por defecto geometrico desde una
+            temperatura inicial estimada a partir de la instancia
+        reeval: int
+            ver LocalSearch
+        moves: str | tuple[str, ...]
+            ver LocalSearch
+        budget: Budget | None
+            presupuesto de computo, que debe limitar el tiempo, las
+            iteraciones o las evaluaciones para poder enfriar
+        init: str | None
+            ver LocalSearch
+        """
+        super().__init__(reeval, moves, budget or Budget(time_limit=1.0),
+                         init)
+        if not self.budget.bounded():
+            raise ValueError("SimulatedAnnealing necesita un presupuesto "
+                             "acotado")
+        self.schedule = schedule
+
+    def solve(self, problem: TSP) -> None:
+        """Resuelve un TSP con recocido simulado.
+
+        Argumentos:
+        ==========
+        problem: TSP
+            una instancia del TSP
+        """
+        # Inicio del reloj para medir el tiempo de ejecución del algoritmo
+        start = time()
+        self.start()
+
+        families = (self.moves,) if isinstance(self.moves, str) else self.moves
+        actual = list(self.initial_state(problem))
+        value = problem.obj_val(actual)
+        best_state, best_value = list(actual), value
+
+        schedule = self.schedule or self._default_schedule(problem, actual)
+        temp = schedule(0.0)
+
+        # La temperatura y el presupuesto se revisan cada cierta cantidad
+        # de iteraciones, para no consultar el reloj en cada una, pero sin
+        # pasarse de los limites de iteraciones, evaluaciones o
+        # estancamiento
+        check, next_check = 1000, 0
+        target = self.budget.target
+        while True:
+            if self.niters >= next_check:
+                frac = self.budget.fraction(self.niters, self.nevals)
+                if self.exhausted(best_value, best_state) or frac >= 1:
+                    break
+                temp = schedule(frac)
+                left = self.budget.steps_left(self.niters, self.nevals,
+                                              self.niters - self._best_iter)
+                next_check = self.niters + max(1, min(check, left))
+
+            # Sorteamos una acción y evaluamos solo su diferencia
+            act = problem.random_action(family=choice(families))
+            delta = problem.delta(actual, act)
+            self.niters += 1
+            self.nevals += 1
+
+            # Aceptamos las mejoras siempre, y los empeoramientos
+            # con probabilidad exp(delta / T)
+            if delta > 0 or (temp > 0 and random.random() < exp(delta / temp)):
+                problem.apply(actual, act)
+                value = self.update_value(problem, actual, value, delta)
+                if value > best_value:
+                    best_state[:] = actual
+                    best_value = value
+                    self.improved(best_value, best_state)
+                    if target is not None and best_value >= target:
+                        next_check = self.niters
+
+        self.tour = best_state
+        self.value = best_value
+        end = time()
+        self.time = end - start
+
+    def _default_schedule(self, problem: TSP,
+                          state: list[int]) -> Callable[[float], float]:
+        """Esquema geometrico con temperatura inicial estimada.
+
+        La temperatura inicial se estima con los movimientos 2-opt que unen
+        una ciudad con una de sus vecinas cercanas en el tour inicial, que
+        son los que cambian poco un buen tour: un empeoramiento medio de
+        esos movimientos se acepta con probabilidad SA_ACCEPTANCE. Asi un
+        tour inicial constructivo no se pierde en las primeras iteraciones.
+        La temperatura final es mil veces menor.
+        """
+        n = problem.n
+        neigh = problem.neighbors(SA_CANDIDATES).tolist()
+        pos = [0] * n
+        for p, c in enumerate(state[:-1]):
+            pos[c] = p
+        worse = []
+        for _ in range(SA_SAMPLES):
+            a = randrange(n)
+            i, j = sorted((pos[a], pos[choice(neigh[a])]))
+            # la accion (i, j) agrega la arista entre a y su vecina
+            if j - i >= 2 and (i > 0 or j < n - 1):
+                delta = problem.delta(state, (i, j))
+                if delta < 0:
+                    worse.append(-delta)
+        mean = sum(worse) / len(worse) if worse else 1.0
+        t0 = max(mean, 1e-9) / log(1 / SA_ACCEPTANCE)
+        return geometric_cooling(t0, t0 / 1000)
+
+
+class LinKernighan(LocalSearch):
+    """Algoritmo de mejora de profundidad variable al estilo Lin-Kernighan.
+
+    Parte de una arista (t1, t2) del tour y encadena movimientos 2-opt:
+    en cada paso agrega una arista desde el extremo libre t2 hacia una de
+    sus k ciudades mas cercanas t3, y quita la arista (t3, t4) que permite
+    volver a cerrar el tour con (t4, t1). La cadena sigue mientras la
+    ganancia parcial sea positiva, hasta max_depth pasos, y al final se
+    conserva el prefijo de la cadena con mayor ganancia. Las ciudades se
+    revisan con bits de "no mirar", como en FirstImprovement.
+
+    Al alcanzar un optimo local, mientras quede tiempo, se perturba el mejor
+    tour con un doble puente sobre tramos cercanos y se vuelve a mejorar
+    (Lin-Kernighan iterado). El criterio de parada es agotar el presupuesto,
+    por defecto un segundo.
+    """
+
+    def __init__(self, k: int = 8, max_depth: int = 50, reeval: int = 0,
+                 budget: Budget | None = None,
+                 init: str | None = None) -> None:
+        """Construye una instancia de la clase.
+
+        Argumentos:
+        ==========
+        k: int
+            cantidad de vecinos cercanos considerados por ciudad
+        max_depth: int
+            cantidad maxima de movimientos encadenados
+        reeval: int
+            ver LocalSearch
+        budget: Budget | None
+            presupuesto de computo, que debe limitar el tiempo, las
+            iteraciones, las evaluaciones o el estancamiento
+        init: str | None
+            ver LocalSearch
+        """
+        super().__init__(reeval, budget=budget or Budget(time_limit=1.0),
+                         init=init)
+        if not (self.budget.bounded() or self.budget.stall is not None):
+            raise ValueError("LinKernighan necesita un presupuesto acotado")
+        self.k = k
+        self.max_depth = max_depth
+
+    def solve(self, problem: TSP) -> None:
+        """Resuelve un TSP con Lin-Kernighan iterado.
+
+        Argumentos:
+        ==========
+        problem: TSP
+            una instancia del TSP
+        """
+        # Inicio del reloj para medir el tiempo de ejecución del algoritmo
+        start = time()
+        self.start()
+
+        neigh = problem.neighbors(self.k).tolist()
+        init = self.initial_state(problem)
+        tour = Tour.from_state(init)
+        value = self._improve(problem, tour, problem.obj_val(init),
+                              neigh, range(problem.n))
+        best_tour, best_value = tour.copy(), value
+
+        while not self.exhausted(best_value, best_tour):
+            # Perturbamos el mejor tour y lo volvemos a mejorar, revisando
+            # solo las ciudades cuyas aristas cambiaron
+            tour = best_tour.copy()
+            delta, touched = self._double_bridge(problem, tour)
+            value = self._improve(problem, tour, best_value + delta, neigh,
+                                  touched)
+            if value > best_value:
+                best_tour, best_value = tour, value
+
+        self.tour = best_tour.to_state()
+        self.value = best_value
+        end = time()
+        self.time = end - start
+
+    def _improve(self, problem: TSP, tour: Tour, value: float,
+                 neigh: list[list[int]], cities: Iterable[int]) -> float:
+        """Mejora un tour en el lugar hasta un optimo local.
+
+        Se detiene antes si se agota el presupuesto.
+
+        Argumentos:
+        ==========
+        problem: TSP
+            una instancia del TSP
+        tour: Tour
+            tour a mejorar, se modifica
+        value: float
+            valor objetivo del tour
+        neigh: list[list[int]]
+            vecinos cercanos de cada ciudad
+        cities: Iterable[int]
+            ciudades con el bit de "no mirar" apagado
+
+        Retorno:
+        =======
+        value: float
+            valor objetivo del tour mejorado
+        """
+        queue = deque(cities)
+        active = [False] * problem.n
+        for c in queue:
+            active[c] = True
+
+        while not self.exhausted(value, tour) and queue:
+            t1 = queue.popleft()
+            active[t1] = False
+            for t2 in (tour.succ(t1), tour.pred(t1)):
+                gain, touched = self._chain(problem.dist, tour, neigh, t1, t2)
+                if gain > 0:
+                    break
+            else:
+                continue
+
+            # Las ciudades cuyas aristas cambiaron vuelven a revisarse
+            for c in touched:
+                if not active[c]:
+                    active[c] = True
+                    queue.append(c)
+            self.niters += 1
+            value = self.update_value(problem, tour, value, gain)
+        return value
+
+    def _chain(self, dist: np.ndarray, tour: Tour, neigh: list[list[int]],
+               t1: int, t2: int) -> tuple[float, set[int]]:
+        """Encadena movimientos 2-opt a partir de la arista (t1, t2).
+
+        Aplica sobre el tour el prefijo de la cadena con mayor ganancia y
+        deshace el resto.
+
+        Retorno:
+        =======
+        gain: float
+            ganancia del prefijo aplicado (0 si no hay mejora)
+        touched: set[int]
+            ciudades cuyas aristas cambiaron
+        """
+        d = dist.item
+        g = d(t1, t2)  # ganancia parcial, sin cerrar el tour
+        best_gain, best_len = 1e-9, 0
+        moves = []  # movimientos aplicados, como ternas (t2, t4, t3)
+        added = set()  # aristas agregadas, que no se pueden volver a quitar
+        touched = {t1, t2}
+        evals = 0  # candidatos t3 evaluados
+
+        while len(moves) < self.max_depth:
+            forward = tour.succ(t1) == t2
+            step = None
+            for t3 in neigh[t2]:
+                evals += 1
+                g1 = g - d(t2, t3)
+                if g1 <= 0:
+                    break  # los siguientes candidatos estan mas lejos
+                if t3 == t1:
+                    continue
+                t4 = tour.pred(t3) if forward else tour.succ(t3)
+                if t4 == t2 or (min(t3, t4), max(t3, t4)) in added:
+                    continue
+                step = t3, t4, g1
+                break
+            if step is None:
+                break
+
+            # Quitamos (t3, t4), agregamos (t2, t3) y cerramos con (t4, t1)
+            t3, t4, g1 = step
+            tour.two_opt_move(t1, t2, t4, t3)
+            moves.append((t2, t4, t3))
+            added.add((min(t2, t3), max(t2, t3)))
+            touched.update((t3, t4))
+            g = g1 + d(t3, t4)
+            closed = g - d(t4, t1)
+            if closed > best_gain:
+                best_gain, best_len = closed, len(moves)
+            t2 = t4
+
+        # Deshacemos los movimientos posteriores al mejor prefijo
+        for t2, t4, t3 in reversed(moves[best_len:]):
+            tour.two_opt_move(t1, t4, t2, t3)
+        self.nevals += evals
+        if best_len == 0:
+            return 0.0, set()
+        return float(best_gain), touched
+
+    @staticmethod
+    def _double_bridge(problem: TSP, tour: Tour,
+                       span: int = 50) -> tuple[float, list[int]]:
+        """Perturba el tour intercambiando dos tramos consecutivos cercanos.
+
+        Retorno:
+        =======
+        delta: float
+            diferencia de valor objetivo de la perturbacion
+        touched: list[int]
+            ciudades cuyas aristas cambiaron
+        """
+        n = problem.n
+        if n < 8:
+            return 0.0, []
+        # Aristas (v_i, v_i+1), (v_j, v_j+1) y (v_k, v_k+1) que se quitan,
+        # a partir de una posicion al azar del tour
+        i = random.randrange(n)
+        j = i + 1 + random.randrange(min(span, (n - 3) // 2))
+        k = j + 1 + random.randrange(min(span, (n - 3) // 2))
+        order, w = tour.order, problem.dist.item
+        touched = [order.item(p % n) for p in (i, i + 1, j, j + 1, k, k + 1)]
+        a, b, c, d, e, f = touched
+        # Se agregan las aristas (v_i, v_j+1), (v_k, v_i+1) y (v_j, v_k+1)
+        delta = (w(a, b) + w(c, d) + w(e, f)
+                 - w(a, d) - w(e, b) - w(c, f))
+        tour.swap_segments(i, j, k)
+        return delta, touched
+
+
+# Algoritmos por nombre, como se eligen desde la linea de comandos
+HILL_CLIMBING = "hill"
+HILL_CLIMBING_RANDOM_RESET = "hill_reset"
+TABU_SEARCH = "tabu"
+FIRST_IMPROVEMENT = "first"
+SIMULATED_ANNEALING = "sa"
+LIN_KERNIGHAN = "lk"
+ALGORITHMS = {HILL_CLIMBING: HillClimbing,
+              HILL_CLIMBING_RANDOM_RESET: HillClimbingReset,
+              TABU_SEARCH: Tabu,
+              FIRST_IMPROVEMENT: FirstImprovement,
+              SIMULATED_ANNEALING: SimulatedAnnealing,
+              LIN_KERNIGHAN: LinKernighan}
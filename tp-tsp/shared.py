@@ -0,0 +1,109 @@
+"""Este modulo permite compartir arreglos de solo lectura entre procesos.
+
+Un arreglo de NumPy se copia entero al pasarlo a otro proceso. Para los
+arreglos grandes que no cambian, como la matriz de distancias de un TSP,
+alcanza con que todos los procesos lean la misma memoria:
+
+* share_array copia un arreglo, una unica vez, a un bloque de memoria
+  compartida (multiprocessing.shared_memory).
+* SharedRef es una referencia liviana a un arreglo en memoria compartida o
+  a un np.memmap de un archivo, que se transfiere en lugar de los datos y
+  se vuelve a abrir en el otro proceso con attach.
+"""
+
+from __future__ import annotations
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+
+
+class SharedRef:
+    """Referencia a un arreglo compartido que se puede transferir."""
+
+    def __init__(self, shape: tuple[int, ...], dtype: str,
+                 name: str | None = None, filename: str | None = None,
+                 offset: int = 0, order: str = "C") -> None:
+        """Construye una referencia.
+
+        Argumentos:
+        ==========
+        shape: tuple[int, ...]
+            dimensiones del arreglo
+        dtype: str
+            tipo de los elementos
+        name: str | None
+            nombre del bloque de memoria compartida
+        filename: str | None
+            archivo mapeado en memoria (si no se indica name)
+        offset: int
+            posicion del arreglo dentro del archivo, en bytes
+        order: str
+            orden de los elementos en el archivo ("C" o "F")
+        """
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.name = name
+        self.filename = filename
+        self.offset = offset
+        self.order = order
+
+    @classmethod
+    def of(cls, array: np.ndarray) -> SharedRef | None:
+        """Referencia a un np.memmap de un archivo, o None si no lo es."""
+        if isinstance(array, np.memmap) and array.filename is not None:
+            order = "F" if array.flags.f_contiguous and \
+                not array.flags.c_contiguous else "C"
+            return cls(array.shape, array.dtype.str, filename=array.filename,
+                       offset=array.offset, order=order)
+        return None
+
+    def attach(self) -> tuple[np.ndarray, SharedMemory | None]:
+        """Abre el arreglo en el proceso actual, en modo de solo lectura.
+
+        Retorno:
+        =======
+        array: np.ndarray
+            el arreglo
+        shm: SharedMemory | None
+            el bloque de memoria compartida, que debe mantenerse abierto
+            mientras se use el arreglo
+        """
+        if self.name is None:
+            array = np.memmap(self.filename, dtype=self.dtype, mode="r",
+                              offset=self.offset, shape=self.shape,
+                              order=self.order)
+            return array, None
+        # Los procesos creados con multiprocessing comparten el registro de
+        # recursos del proceso principal, que es quien libera el bloque
+        shm = SharedMemory(name=self.name)
+        array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+        array.flags.writeable = False
+        return array, shm
+
+
+def share_array(array: np.ndarray
+                ) -> tuple[np.ndarray, SharedMemory, SharedRef]:
+    """Copia un arreglo a un bloque nuevo de memoria compartida.
+
+    Quien llama es responsable de liberar el bloque con shm.close() y
+    shm.unlink() cuando ningun proceso lo use.
+
+    Argumentos:
+    ==========
+    array: np.ndarray
+        el arreglo a compartir
+
+    Retorno:
+    =======
+    view: np.ndarray
+        el arreglo en memoria compartida, de solo lectura
+    shm: SharedMemory
+        el bloque de memoria compartida
+    ref: SharedRef
+        referencia para abrir el arreglo desde otro proceso
+    """
+    array = np.ascontiguousarray(array)
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    view.flags.writeable = False
+    return view, shm, SharedRef(array.shape, array.dtype.str, name=shm.name)
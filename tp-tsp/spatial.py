@@ -0,0 +1,251 @@
+"""Este modulo define la clase KDTree.
+
+KDTree es un indice espacial sobre las coordenadas de las ciudades que
+responde consultas de vecinos mas cercanos y de radio sin comparar contra
+todas las ciudades:
+
+* construirlo cuesta O(n log n),
+* una consulta visita solo las regiones del plano que pueden contener
+  una respuesta, en O(log n) para los k vecinos de un punto,
+* los puntos se pueden desactivar, para buscar el mas cercano entre los que
+  quedan (por ejemplo, entre las ciudades sin visitar).
+
+Cada hoja agrupa varios puntos, de modo que las distancias dentro de una
+hoja, y las consultas de muchos puntos cercanos a la vez, se calculan con
+operaciones vectorizadas de NumPy.
+"""
+
+from __future__ import annotations
+import numpy as np
+
+
+class KDTree:
+    """Arbol k-dimensional sobre un conjunto de puntos."""
+
+    def __init__(self, points: np.ndarray, leafsize: int = 32) -> None:
+        """Construye el arbol.
+
+        Argumentos:
+        ==========
+        points: np.ndarray
+            matriz de n x d con las coordenadas de cada punto
+        leafsize: int
+            cantidad maxima de puntos por hoja
+        """
+        self.points = np.asarray(points, dtype=np.float64)
+        self.n = len(self.points)
+        self.index = np.arange(self.n)  # puntos ordenados por hoja
+        self.active = np.ones(self.n, dtype=bool)  # puntos no desactivados
+        self.leaf = np.empty(self.n, dtype=np.int64)  # hoja de cada punto
+
+        start, end, parent, left, right, lo, hi = [], [], [], [], [], [], []
+        stack = [(0, self.n, -1, left)] if self.n else []
+        while stack:
+            a, b, up, side = stack.pop()
+            node = len(start)
+            if up >= 0:
+                side[up] = node
+            ids = self.index[a:b]
+            box = self.points[ids]
+            start.append(a)
+            end.append(b)
+            parent.append(up)
+            left.append(-1)
+            right.append(-1)
+            lo.append(box.min(axis=0))
+            hi.append(box.max(axis=0))
+            if b - a <= leafsize:
+                self.leaf[ids] = node
+                continue
+            # Partimos por la mediana de la coordenada de mayor extension
+            axis = int(np.argmax(hi[-1] - lo[-1]))
+            mid = (a + b) // 2
+            part = np.argpartition(box[:, axis], mid - a)
+            self.index[a:b] = ids[part]
+            stack.append((mid, b, node, right))
+            stack.append((a, mid, node, left))
+
+        self.start = np.array(start, dtype=np.int64)
+        self.end = np.array(end, dtype=np.int64)
+        self.parent = np.array(parent, dtype=np.int64)
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        self.lo = np.array(lo).reshape(-1, self.points.shape[1])
+        self.hi = np.array(hi).reshape(-1, self.points.shape[1])
+        self.count = self.end - self.start  # puntos activos de cada nodo
+        # Copias como listas para recorrer el arbol sin indexar arreglos
+        self._left, self._right = left, right
+        self._lo, self._hi = self.lo.tolist(), self.hi.tolist()
+
+    def remove(self, i: int) -> None:
+        """Desactiva el punto i, que deja de aparecer en las consultas."""
+        if not self.active[i]:
+            return
+        self.active[i] = False
+        node = self.leaf.item(i)
+        while node >= 0:
+            self.count[node] -= 1
+            node = self.parent.item(node)
+
+    def query(self, x: np.ndarray, k: int = 1) -> tuple[np.ndarray, ...]:
+        """Busca los k puntos activos mas cercanos a cada punto de x.
+
+        Argumentos:
+        ==========
+        x: np.ndarray
+            un punto de d coordenadas, o una matriz de m x d
+        k: int
+            cantidad de vecinos
+
+        Retorno:
+        =======
+        dist: np.ndarray
+            distancias euclideas a los vecinos, de menor a mayor
+        idx: np.ndarray
+            indices de los vecinos, -1 si hay menos de k puntos activos
+        """
+        x = np.asarray(x, dtype=np.float64)
+        single = x.ndim == 1
+        x = np.atleast_2d(x)
+        dist = np.empty((len(x), k))
+        idx = np.empty((len(x), k), dtype=np.int64)
+        for a in range(len(x)):
+            d, i = self._knn(x[a:a + 1], k)
+            dist[a], idx[a] = np.sqrt(d[0]), i[0]
+        if single:
+            return dist[0], idx[0]
+        return dist, idx
+
+    def knn(self, k: int) -> np.ndarray:
+        """Busca los k vecinos mas cercanos de cada punto del arbol.
+
+        Los puntos de cada hoja se consultan juntos, ya que sus vecinos
+        estan en las mismas regiones del plano.
+
+        Argumentos:
+        ==========
+        k: int
+            cantidad de vecinos por punto, sin contar al propio punto
+
+        Retorno:
+        =======
+        idx: np.ndarray
+            matriz de n x k, la fila i tiene los vecinos del punto i
+            ordenados por distancia creciente
+        """
+        idx = np.empty((self.n, k), dtype=np.int64)
+        for node in np.flatnonzero(self.left < 0).tolist():
+            ids = self.index[self.start[node]:self.end[node]]
+            _, idx[ids] = self._knn(self.points[ids], k, exclude=ids)
+        return idx
+
+    def query_radius(self, x: np.ndarray, r: float) -> np.ndarray:
+        """Busca los puntos activos a distancia a lo sumo r de x.
+
+        Argumentos:
+        ==========
+        x: np.ndarray
+            un punto de d coordenadas
+        r: float
+            radio de la consulta
+
+        Retorno:
+        =======
+        idx: np.ndarray
+            indices de los puntos, ordenados por distancia creciente
+        """
+        x = np.asarray(x, dtype=np.float64)
+        r2 = r * r
+        found, dists = [], []
+        stack = [0] if self.n else []
+        while stack:
+            node = stack.pop()
+            if self.count[node] == 0:
+                continue
+            gap = (np.maximum(self.lo[node] - x, 0)
+                   + np.maximum(x - self.hi[node], 0))
+            if gap @ gap > r2:
+                continue
+            if self.left[node] >= 0:
+                stack.append(self.left[node])
+                stack.append(self.right[node])
+                continue
+            ids = self._leaf_points(node)
+            delta = self.points[ids] - x
+            d = np.einsum('ij,ij->i', delta, delta)
+            keep = d <= r2
+            found.append(ids[keep])
+            dists.append(d[keep])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        found, dists = np.concatenate(found), np.concatenate(dists)
+        return found[np.argsort(dists, kind='stable')]
+
+    def _leaf_points(self, node: int) -> np.ndarray:
+        """Puntos activos de una hoja."""
+        ids = self.index[self.start[node]:self.end[node]]
+        if self.count[node] < len(ids):
+            ids = ids[self.active[ids]]
+        return ids
+
+    def _box_gap(self, node: int, low: list[float],
+                 high: list[float]) -> float:
+        """Distancia al cuadrado entre la caja de un nodo y otra caja."""
+        gap = 0.0
+        for a, b, lo, hi in zip(low, high, self._lo[node], self._hi[node]):
+            g = lo - b if lo > b else a - hi if a > hi else 0.0
+            gap += g * g
+        return gap
+
+    def _knn(self, x: np.ndarray, k: int,
+             exclude: np.ndarray | None = None) -> tuple[np.ndarray, ...]:
+        """Busca los k vecinos de un bloque de puntos cercanos entre si.
+
+        El recorrido compara la caja de cada nodo con la caja del bloque, y
+        descarta el nodo cuando esta mas lejos que el k-esimo vecino de todos
+        los puntos del bloque. Solo las hojas se comparan punto a punto.
+
+        Retorno:
+        =======
+        dist: np.ndarray
+            distancias al cuadrado, de menor a mayor
+        idx: np.ndarray
+            indices de los vecinos
+        """
+        m = len(x)
+        rows = np.arange(m)[:, None]
+        best_d = np.full((m, k), np.inf)
+        best_i = np.full((m, k), -1, dtype=np.int64)
+        bound = np.inf  # mayor k-esima distancia del bloque
+        low, high = x.min(axis=0).tolist(), x.max(axis=0).tolist()
+        count, left, right = self.count, self._left, self._right
+        stack = [(0.0, 0)] if self.n else []
+        while stack:
+            gap, node = stack.pop()
+            if gap >= bound or count.item(node) == 0:
+                continue
+            a, b = left[node], right[node]
+            if a >= 0:
+                # Visitamos primero el hijo mas cercano al bloque
+                ga = self._box_gap(a, low, high)
+                gb = self._box_gap(b, low, high)
+                if ga <= gb:
+                    stack.extend(((gb, b), (ga, a)))
+                else:
+                    stack.extend(((ga, a), (gb, b)))
+                continue
+            ids = self._leaf_points(node)
+            delta = x[:, None, :] - self.points[ids][None, :, :]
+            d = np.einsum('ijk,ijk->ij', delta, delta)
+            if exclude is not None:
+                d[exclude[:, None] == ids[None, :]] = np.inf
+            cand_d = np.concatenate((best_d, d), axis=1)
+            cand_i = np.concatenate((best_i, np.broadcast_to(ids, d.shape)),
+                                    axis=1)
+            sel = np.argpartition(cand_d, k - 1, axis=1)[:, :k]
+            best_d, best_i = cand_d[rows, sel], cand_i[rows, sel]
+            bound = best_d.max()
+        order = np.argsort(best_d, axis=1, kind='stable')
+        best_d, best_i = best_d[rows, order], best_i[rows, order]
+        best_i[np.isinf(best_d)] = -1
+        return best_d, best_i
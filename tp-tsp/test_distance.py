@@ -0,0 +1,33 @@
+"""Pruebas de las distancias calculadas bajo demanda.
+
+Uso: python -m pytest test_distance.py
+"""
+
+import numpy as np
+import pytest
+from distance import LazyDistance
+
+
+@pytest.mark.parametrize("cache_rows", [0, 4])
+def test_lazy_matches_dense(cache_rows):
+    """LazyDistance da las mismas distancias con y sin cache de filas."""
+    points = np.random.default_rng(0).integers(0, 1000, size=(50, 2))
+    dist = LazyDistance(points, cache_rows=cache_rows)
+    dense = np.asarray(LazyDistance(points))
+    idx = np.array([3, 7, 11])
+    assert np.array_equal(dist[5, idx], dense[5, idx])
+    assert np.array_equal(dist[10:20], dense[10:20])
+    assert np.array_equal(dist[idx], dense[idx])
+    assert np.array_equal(dist[idx[:, None], idx], dense[idx[:, None], idx])
+    assert dist.item(12, 30) == dense[12, 30]
+    assert dist[12, 30] == dense[12, 30]
+
+
+def test_lazy_row_cache_is_filled():
+    """Las consultas de filas guardan las ultimas cache_rows filas."""
+    points = np.random.default_rng(0).integers(0, 1000, size=(50, 2))
+    dist = LazyDistance(points, cache_rows=3)
+    dist[5, [1, 2]]
+    dist[10:14]
+    assert list(dist._rows) == [11, 12, 13]
+    assert dist.item(13, 40) == dist[13][40]
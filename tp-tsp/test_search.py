@@ -0,0 +1,95 @@
+"""Pruebas de las busquedas locales.
+
+Uso: python -m pytest test_search.py
+"""
+
+import os
+import random
+import numpy as np
+import pytest
+import load
+import problem
+import search
+from problem import OR_OPT, THREE_OPT, TWO_OPT
+
+INSTANCES = os.path.join(os.path.dirname(__file__), "instances")
+
+
+def read(name: str) -> problem.TSP:
+    """Lee una de las instancias incluidas."""
+    dist, coords = load.read_tsp_native(os.path.join(INSTANCES, name + ".tsp"))
+    return problem.TSP(None, dist=dist, coords=coords)
+
+
+@pytest.mark.parametrize("moves", [TWO_OPT, OR_OPT, THREE_OPT,
+                                   (OR_OPT, THREE_OPT)])
+def test_actions_are_unique(moves):
+    """Cada accion aparece una unica vez, tambien al combinar familias."""
+    p = read("pr76")
+    acts = p.actions(None, moves)
+    assert len(set(acts)) == len(acts) == p.nactions(moves)
+    for k in range(0, len(acts), 97):
+        assert p.action_index(acts[k], moves) == k
+
+
+@pytest.mark.parametrize("moves", [TWO_OPT, OR_OPT, THREE_OPT,
+                                   (OR_OPT, THREE_OPT)])
+def test_tabu_does_not_reverse_moves(moves, monkeypatch):
+    """Tabu no deshace una accion en la iteracion siguiente."""
+    p = read("pr76")
+    applied = []
+    apply = p.apply
+
+    def record(state, action):
+        applied.append(action)
+        apply(state, action)
+
+    monkeypatch.setattr(p, "apply", record)
+    algo = search.Tabu(moves=moves, budget=search.Budget(max_iters=200))
+    algo.solve(p)
+    moves_made = applied[:algo.niters]
+    assert len(moves_made) == 200
+    for act, following in zip(moves_made, moves_made[1:]):
+        assert following != p.inverse(act)
+
+
+@pytest.mark.parametrize("n", [3, 4, 5])
+def test_tabu_on_tiny_instances(n):
+    """Tabu sigue con un tour valido aunque todas las acciones sean tabu."""
+    points = np.random.default_rng(n).integers(0, 100, size=(n, 2))
+    dist = np.hypot(*(points[:, None] - points[None]).transpose(2, 0, 1))
+    p = problem.TSP(None, dist=dist, coords={})
+    for moves in (TWO_OPT, OR_OPT):
+        algo = search.Tabu(moves=moves, budget=search.Budget(max_iters=50))
+        algo.solve(p)
+        assert sorted(algo.tour[:-1]) == list(range(n))
+        assert algo.value == pytest.approx(p.obj_val(algo.tour))
+
+
+def test_restarts_forget_previous_solve():
+    """Un segundo solve de HillClimbingReset no conserva el tour anterior."""
+    algo = search.HillClimbingReset(restarts=3, seed=0)
+    algo.solve(read("burma14"))
+    p = read("pr76")
+    algo.solve(p)
+    fresh = search.HillClimbingReset(restarts=3, seed=0)
+    fresh.solve(p)
+    assert len(algo.tour) == p.n + 1
+    assert (algo.value, algo.niters, algo.nevals) == \
+        (fresh.value, fresh.niters, fresh.nevals)
+    assert len(algo.runs) == 3
+
+
+def test_annealing_improves_greedy_start():
+    """El recocido simulado mejora un tour inicial greedy."""
+    points = np.random.default_rng(0).integers(0, 10000, size=(500, 2))
+    diff = points[:, None] - points[None]
+    dist = np.rint(np.hypot(diff[..., 0], diff[..., 1]))
+    p = problem.TSP(None, dist=dist,
+                    coords=dict(enumerate(map(tuple, points), start=1)))
+    greedy = p.obj_val(p.initial_tour(problem.GREEDY))
+    random.seed(0)
+    algo = search.SimulatedAnnealing(init=problem.GREEDY,
+                                     budget=search.Budget(max_iters=200000))
+    algo.solve(p)
+    assert algo.value > greedy
@@ -0,0 +1,138 @@
+"""Este modulo define la clase Tour.
+
+Tour es una representacion compacta de un tour del TSP pensada para las
+busquedas que trabajan sobre ciudades en lugar de posiciones (por ejemplo,
+las que usan listas de vecinos cercanos).
+
+A diferencia de un estado de TSP ([0] ++ permutacion ++ [0]), un Tour es
+ciclico: no repite la primera ciudad ni la fija al principio. Guarda el
+orden de las ciudades y la posicion de cada ciudad en ese orden, ambos como
+arreglos de enteros de 32 bits, de modo que:
+
+* el sucesor, el predecesor y la posicion de una ciudad se obtienen en O(1),
+* un movimiento 2-opt invierte en el lugar el lado mas corto del tour,
+  sin construir un nuevo tour de n ciudades,
+* intercambiar dos tramos consecutivos cuesta lo que miden los tramos,
+* una copia del tour es una copia de memoria contigua.
+"""
+
+from __future__ import annotations
+from typing import Iterable
+import numpy as np
+
+
+class Tour:
+    """Tour ciclico con indice de posiciones."""
+
+    def __init__(self, order: Iterable[int]) -> None:
+        """Construye un tour a partir del orden de visita de las ciudades.
+
+        Argumentos:
+        ==========
+        order: Iterable[int]
+            las ciudades 0, ..., n-1 en el orden en que se visitan
+        """
+        self.order = np.array(order, dtype=np.int32)
+        self.n = len(self.order)
+        self.pos = np.empty(self.n, dtype=np.int32)
+        self._index = np.arange(self.n, dtype=np.int32)
+        self.pos[self.order] = self._index
+
+    @classmethod
+    def from_state(cls, state: list[int]) -> Tour:
+        """Construye un tour a partir de un estado de TSP."""
+        return cls(state[:-1])
+
+    def to_state(self) -> list[int]:
+        """Devuelve el estado de TSP equivalente, que empieza y termina en 0."""
+        p = self.pos.item(0)
+        state = np.roll(self.order, -p).tolist()
+        state.append(0)
+        return state
+
+    def copy(self) -> Tour:
+        """Devuelve una copia independiente del tour."""
+        tour = Tour.__new__(Tour)
+        tour.order = self.order.copy()
+        tour.pos = self.pos.copy()
+        tour.n = self.n
+        tour._index = self._index
+        return tour
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        """Devuelve el ciclo como arreglo, repitiendo la primera ciudad.
+
+        Permite evaluar un Tour con TSP.obj_val, que no depende de la
+        ciudad en la que empieza el ciclo.
+        """
+        return np.append(self.order, self.order[:1]).astype(dtype or np.int32)
+
+    def __len__(self) -> int:
+        """Cantidad de ciudades del tour."""
+        return self.n
+
+    def succ(self, c: int) -> int:
+        """Ciudad que se visita despues de c."""
+        p = self.pos.item(c) + 1
+        return self.order.item(p if p < self.n else 0)
+
+    def pred(self, c: int) -> int:
+        """Ciudad que se visita antes de c."""
+        return self.order.item(self.pos.item(c) - 1)
+
+    def between(self, a: int, b: int, c: int) -> bool:
+        """Determina si b esta en el camino que va de a hasta c."""
+        pa, pb, pc = self.pos.item(a), self.pos.item(b), self.pos.item(c)
+        if pa <= pc:
+            return pa <= pb <= pc
+        return pb >= pa or pb <= pc
+
+    def reverse(self, a: int, b: int) -> None:
+        """Invierte el camino que va de la ciudad a hasta la ciudad b.
+
+        Como el tour es ciclico, invertir ese camino equivale a invertir el
+        resto del tour, por lo que se invierte el lado mas corto.
+        """
+        n, order, pos = self.n, self.order, self.pos
+        i, j = pos.item(a), pos.item(b)
+        length = (j - i) % n + 1
+        if 2 * length > n:
+            # Invertimos el complemento, de succ(b) a pred(a)
+            i, j = (j + 1) % n, (i - 1) % n
+            length = n - length
+        if i <= j:
+            segment = slice(i, j + 1)
+            order[segment] = order[segment][::-1]
+            pos[order[segment]] = self._index[segment]
+            return
+        # El tramo da la vuelta al final del arreglo
+        segment = np.arange(i, i + length) % n
+        order[segment] = order[segment[::-1]]
+        pos[order[segment]] = segment
+
+    def two_opt_move(self, a: int, b: int, c: int, d: int) -> None:
+        """Aplica un movimiento 2-opt en el lugar.
+
+        Reemplaza las aristas (a, b) y (c, d) por las aristas (a, c) y
+        (b, d). Las aristas deben recorrerse en el mismo sentido, es decir,
+        b = succ(a) y d = succ(c), o bien b = pred(a) y d = pred(c).
+        El movimiento se deshace con two_opt_move(a, c, b, d).
+        """
+        if self.succ(a) == b:
+            self.reverse(b, c)
+        else:
+            self.reverse(a, d)
+
+    def swap_segments(self, i: int, j: int, k: int) -> None:
+        """Intercambia en el lugar dos tramos consecutivos del tour.
+
+        Los tramos son las posiciones i+1, ..., j y j+1, ..., k, tomadas de
+        forma ciclica, con i < j < k < i + n. Es el movimiento (i, j, k) de
+        Or-opt y 3-opt sobre las posiciones del tour.
+        """
+        n, order, pos = self.n, self.order, self.pos
+        segment = np.arange(i + 1, k + 1) % n
+        cities = order[segment]
+        cities = np.concatenate((cities[j - i:], cities[:j - i]))
+        order[segment] = cities
+        pos[cities] = segment